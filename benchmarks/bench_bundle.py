@@ -0,0 +1,98 @@
+"""Compare loading a spec from a compiled snapshot and from a mapped bundle
+
+A snapshot unpickles the whole spec up front; a bundle maps the file and
+decodes operations and schemas as tools read them. Reports load time,
+Python heap held after loading and after a batch of lookups, and the time
+per get_endpoint/get_schema call.
+
+Usage: python benchmarks/bench_bundle.py [--operations N] [--lookups N]
+"""
+
+import argparse
+import pickle
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic import synthetic_spec
+
+from main import (
+    OpenAPIServer,
+    SpecIndex,
+    read_spec_bundle,
+    write_spec_bundle,
+)
+
+
+def load_snapshot(path: Path) -> SpecIndex:
+    return pickle.loads(path.read_bytes())
+
+
+def load_bundle(path: Path) -> SpecIndex:
+    return read_spec_bundle(path)
+
+
+def lookups(server: OpenAPIServer, index: SpecIndex, n: int):
+    rng = random.Random(0)
+    for _ in range(n):
+        endpoint = rng.choice(index.endpoints)
+        server.get_endpoint_details(endpoint["path"], endpoint["method"])
+        server.get_schema_details(rng.choice(index.schemas)["name"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument("--operations", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=1_000)
+    args = parser.parse_args()
+
+    n_operations, n_lookups = args.operations, args.lookups
+    index = SpecIndex(synthetic_spec(n_operations))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot_path = Path(tmp) / "spec.snapshot"
+        snapshot_path.write_bytes(pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL))
+        bundle_path = Path(tmp) / "spec.bundle"
+        write_spec_bundle(bundle_path, index, "synthetic")
+        del index
+
+        print(f"{n_operations} operations, {n_lookups} endpoint + schema lookups")
+        print(
+            f"{'source':<9} {'file MB':>8} {'load s':>8} {'heap MB':>8} "
+            f"{'+lookups':>9} {'ms/call':>8}"
+        )
+        for name, load, path in [
+            ("snapshot", load_snapshot, snapshot_path),
+            ("bundle", load_bundle, bundle_path),
+        ]:
+            start = time.perf_counter()
+            load(path)
+            load_seconds = time.perf_counter() - start
+
+            tracemalloc.start()
+            loaded = load(path)
+            server = OpenAPIServer(str(path), workers=0, response_cache_bytes=0)
+            source = next(iter(server.specs.values()))
+            source.publish(loaded)
+            loaded_bytes = tracemalloc.get_traced_memory()[0]
+            lookups(server, loaded, n_lookups)
+            queried_bytes = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+
+            start = time.perf_counter()
+            lookups(server, loaded, n_lookups)
+            call_ms = (time.perf_counter() - start) / (2 * n_lookups) * 1000
+            print(
+                f"{name:<9} {path.stat().st_size / 1e6:>8.1f} {load_seconds:>8.3f} "
+                f"{loaded_bytes / 1e6:>8.1f} {queried_bytes / 1e6:>9.1f} {call_ms:>8.3f}"
+            )
+            del server, source, loaded
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Compare response sizes and encode times of the output formats per tool
+
+Usage: python benchmarks/bench_formats.py [--operations N]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic import synthetic_spec
+
+from main import OUTPUT_FORMATS, OpenAPIServer, encode_response
+
+REPEAT = 5
+
+
+def tool_results(server: OpenAPIServer) -> dict:
+    """One representative result per tool"""
+    assert server.index is not None
+    endpoint = server.index.endpoints[0]
+    return {
+        "search_endpoints": server.search_endpoints("user"),
+        "list_all_endpoints": server.list_endpoints(),
+        "get_endpoint": server.get_endpoint_details(
+            endpoint["path"], endpoint["method"]
+        ),
+        "match_endpoint": server.match_endpoint("/v1/user0s/42", "GET"),
+        "search_schemas": server.search_schemas("user"),
+        "get_schema": server.get_schema_details("User0"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument("--operations", type=int, default=10_000)
+    args = parser.parse_args()
+
+    n_operations = args.operations
+    with tempfile.TemporaryDirectory() as tmp:
+        spec_path = Path(tmp) / "spec.json"
+        spec_path.write_text(json.dumps(synthetic_spec(n_operations)))
+        server = OpenAPIServer(str(spec_path), workers=0)
+        asyncio.run(server.load_specs())
+
+    print(f"{n_operations} operations, best of {REPEAT}")
+    print(f"{'tool':<20} {'format':<13} {'bytes':>9} {'vs json':>8} {'encode ms':>10}")
+    for tool, result in tool_results(server).items():
+        baseline = None
+        for fmt in OUTPUT_FORMATS:
+            best, text = float("inf"), ""
+            for _ in range(REPEAT):
+                start = time.perf_counter()
+                text = encode_response(result, fmt)
+                best = min(best, time.perf_counter() - start)
+            size = len(text.encode("utf-8"))
+            baseline = baseline or size
+            print(
+                f"{tool:<20} {fmt:<13} {size:>9} {size / baseline:>8.0%} "
+                f"{best * 1000:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Compare spec parser backends on synthetic specs
+
+Usage: python benchmarks/bench_parsers.py [--operations N [N ...]]
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic import synthetic_spec
+
+from main import parser_backends
+
+SIZES = [1_000, 10_000, 50_000]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument("--operations", type=int, nargs="+", default=SIZES, metavar="N")
+    args = parser.parse_args()
+
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    print(
+        f"{'operations':>10}  {'format':<6} {'backend':<8} {'bytes':>12} {'seconds':>9}"
+    )
+    for n_operations in args.operations:
+        spec = synthetic_spec(n_operations)
+        documents = {
+            "json": json.dumps(spec).encode("utf-8"),
+            "yaml": yaml.dump(spec, Dumper=dumper).encode("utf-8"),
+        }
+        for fmt, content in documents.items():
+            for backend in parser_backends(fmt):
+                start = time.perf_counter()
+                backend.load(content)
+                elapsed = time.perf_counter() - start
+                print(
+                    f"{n_operations:>10}  {fmt:<6} {backend.name:<8} "
+                    f"{len(content):>12} {elapsed:>9.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Guard $ref resolution against blow-ups on pathological reference graphs
+
+Builds specs whose schemas form a diamond lattice (every schema references
+the next level twice, so the number of paths doubles per level) and a long
+cycle, then times get_schema on the root. Resolution must stay linear in the
+graph size; the script exits non-zero if any case exceeds --max-seconds.
+
+Usage: python benchmarks/bench_resolver.py [--depth N] [--max-seconds S]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from main import OpenAPIServer
+
+
+def ref(name: str) -> dict:
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def diamond_schemas(depth: int, width: int) -> dict:
+    """Levels of width schemas, each referencing every schema of the next level"""
+    schemas = {}
+    for level in range(depth):
+        for i in range(width):
+            properties = {}
+            if level + 1 < depth:
+                properties = {
+                    f"next{j}": ref(f"L{level + 1}N{j}") for j in range(width)
+                }
+            schemas[f"L{level}N{i}"] = {"type": "object", "properties": properties}
+    return schemas
+
+
+def cycle_schemas(length: int) -> dict:
+    """A ring of schemas where each one also references every fifth schema"""
+    schemas = {}
+    for i in range(length):
+        schemas[f"C{i}"] = {
+            "type": "object",
+            "properties": {
+                "next": ref(f"C{(i + 1) % length}"),
+                "skip": ref(f"C{(i + 5) % length}"),
+            },
+        }
+    return schemas
+
+
+def time_resolution(schemas: dict, root: str) -> float:
+    spec = {"openapi": "3.0.0", "paths": {}, "components": {"schemas": schemas}}
+    with tempfile.TemporaryDirectory() as tmp:
+        spec_path = Path(tmp) / "spec.json"
+        spec_path.write_text(json.dumps(spec))
+        server = OpenAPIServer(str(spec_path))
+        asyncio.run(server.load_specs())
+    start = time.perf_counter()
+    result = server.get_schema_details(root)
+    elapsed = time.perf_counter() - start
+    assert "error" not in result, result
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument("--depth", type=int, default=2_000)
+    parser.add_argument("--max-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    cases = [
+        ("diamond width 2", diamond_schemas(args.depth, 2), "L0N0"),
+        ("diamond width 8", diamond_schemas(args.depth // 4, 8), "L0N0"),
+        ("cycle", cycle_schemas(args.depth), "C0"),
+    ]
+    failed = False
+    for name, schemas, root in cases:
+        elapsed = time_resolution(schemas, root)
+        status = "ok" if elapsed <= args.max_seconds else "TOO SLOW"
+        failed = failed or elapsed > args.max_seconds
+        print(f"{name:<18} {len(schemas):>7} schemas {elapsed:>8.3f}s  {status}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
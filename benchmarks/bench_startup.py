@@ -0,0 +1,156 @@
+"""Measure server startup: --help, initialize response and first tool result
+
+Each run spawns a fresh interpreter over stdio, like an MCP client launching
+the server, and times it from spawn. "cold" runs skip the snapshot cache;
+"warm" runs reuse a snapshot written by a priming run. Pass --record FILE to
+append the medians as a JSON line, to follow startup time across commits.
+
+Usage: python benchmarks/bench_startup.py [--operations N] [--runs N] [--record FILE]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic import synthetic_spec
+
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+
+
+def request(id: int, method: str, params: dict) -> bytes:
+    message = {"jsonrpc": "2.0", "id": id, "method": method, "params": params}
+    return (json.dumps(message) + "\n").encode("utf-8")
+
+
+def read_response(proc: subprocess.Popen, id: int) -> dict:
+    assert proc.stdout is not None
+    for line in proc.stdout:
+        message = json.loads(line)
+        if message.get("id") == id:
+            return message
+    raise RuntimeError(f"Server exited before answering request {id}")
+
+
+def time_help() -> float:
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, str(MAIN), "--help"], capture_output=True, check=True
+    )
+    return time.perf_counter() - start
+
+
+def time_session(spec_path: Path, cache_args: list) -> tuple:
+    """Seconds from spawn to the initialize response and to the first tool result"""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        [
+            sys.executable,
+            str(MAIN),
+            str(spec_path),
+            "--no-watch",
+            "--log-level",
+            "WARNING",
+        ]
+        + cache_args,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    assert proc.stdin is not None
+    try:
+        proc.stdin.write(
+            request(
+                1,
+                "initialize",
+                {
+                    "protocolVersion": "2025-06-18",
+                    "capabilities": {},
+                    "clientInfo": {"name": "bench_startup", "version": "0"},
+                },
+            )
+        )
+        proc.stdin.flush()
+        read_response(proc, 1)
+        initialized = time.perf_counter() - start
+
+        proc.stdin.write(b'{"jsonrpc": "2.0", "method": "notifications/initialized"}\n')
+        proc.stdin.write(
+            request(
+                2,
+                "tools/call",
+                {
+                    "name": "search_endpoints",
+                    "arguments": {"query": "user", "limit": 1},
+                },
+            )
+        )
+        proc.stdin.flush()
+        response = read_response(proc, 2)
+        if response.get("result", {}).get("isError"):
+            raise RuntimeError(f"First tool call failed: {response}")
+        first_result = time.perf_counter() - start
+    finally:
+        proc.stdin.close()
+        proc.wait()
+    return initialized, first_result
+
+
+def git_commit() -> str | None:
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"],
+        cwd=MAIN.parent,
+        capture_output=True,
+        text=True,
+    )
+    return result.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=(__doc__ or "").partition("\n")[0])
+    parser.add_argument("--operations", type=int, default=5_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--record", metavar="FILE", help="Append the medians to FILE as JSON"
+    )
+    args = parser.parse_args()
+
+    results = {"help": [time_help() for _ in range(args.runs)]}
+    with tempfile.TemporaryDirectory() as tmp:
+        spec_path = Path(tmp) / "spec.json"
+        spec_path.write_text(json.dumps(synthetic_spec(args.operations)))
+        cache_dir = Path(tmp) / "cache"
+        modes = {"cold": ["--no-cache"], "warm": ["--cache-dir", str(cache_dir)]}
+        time_session(spec_path, modes["warm"])  # writes the snapshot
+        for mode, cache_args in modes.items():
+            runs = [time_session(spec_path, cache_args) for _ in range(args.runs)]
+            results[f"{mode} initialize"] = [initialized for initialized, _ in runs]
+            results[f"{mode} first result"] = [first_result for _, first_result in runs]
+
+    print(f"{args.operations} operations, {args.runs} runs")
+    print(f"{'measure':<20} {'min':>8} {'median':>8}")
+    for name, times in results.items():
+        print(f"{name:<20} {min(times):>8.3f} {statistics.median(times):>8.3f}")
+
+    if args.record:
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": git_commit(),
+            "operations": args.operations,
+            "runs": args.runs,
+            "median_seconds": {
+                name: round(statistics.median(t), 4) for name, t in results.items()
+            },
+        }
+        with open(args.record, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Synthetic OpenAPI specs for benchmarks"""
+
+RESOURCES = ["user", "order", "invoice", "product", "account", "payment", "shipment"]
+
+
+def synthetic_spec(n_operations: int) -> dict:
+    """Build an OpenAPI 3.0 spec with roughly n_operations operations
+
+    Every resource gets a collection and an item path with CRUD operations,
+    and one schema per resource that references a few shared schemas.
+    """
+    paths = {}
+    schemas = {
+        "Money": {
+            "type": "object",
+            "properties": {
+                "amount": {"type": "number"},
+                "currency": {"type": "string"},
+            },
+        },
+        "Address": {
+            "type": "object",
+            "properties": {
+                "street": {"type": "string"},
+                "city": {"type": "string"},
+                "country": {"type": "string"},
+            },
+        },
+    }
+    i = 0
+    while len(paths) * 5 // 2 < n_operations:
+        resource = f"{RESOURCES[i % len(RESOURCES)]}{i}"
+        schema_name = resource.capitalize()
+        ref = {"$ref": f"#/components/schemas/{schema_name}"}
+        schemas[schema_name] = {
+            "type": "object",
+            "description": f"A {resource} resource",
+            "properties": {
+                "id": {"type": "string"},
+                "address": {"$ref": "#/components/schemas/Address"},
+                "total": {"$ref": "#/components/schemas/Money"},
+            },
+        }
+        response = {
+            "200": {
+                "description": "OK",
+                "content": {"application/json": {"schema": ref}},
+            }
+        }
+        paths[f"/v1/{resource}s"] = {
+            "get": {
+                "operationId": f"list{schema_name}s",
+                "summary": f"List {resource}s",
+                "tags": [resource],
+                "responses": response,
+            },
+            "post": {
+                "operationId": f"create{schema_name}",
+                "summary": f"Create a {resource}",
+                "tags": [resource],
+                "requestBody": {"content": {"application/json": {"schema": ref}}},
+                "responses": response,
+            },
+        }
+        item_param = [
+            {"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}
+        ]
+        paths[f"/v1/{resource}s/{{id}}"] = {
+            method: {
+                "operationId": f"{method}{schema_name}",
+                "summary": f"{method.capitalize()} a {resource}",
+                "description": f"Operates on a single {resource} by id",
+                "tags": [resource],
+                "parameters": item_param,
+                "responses": response,
+            }
+            for method in ("get", "put", "delete")
+        }
+        i += 1
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "Synthetic", "version": "1.0.0"},
+        "paths": paths,
+        "components": {"schemas": schemas},
+    }
@@ -1,387 +1,3684 @@
 import argparse
 import asyncio
+import base64
+import contextlib
+import contextvars
+import copy
+import fcntl
+import functools
+import glob
+import hashlib
+import heapq
+import itertools
 import json
 import logging
+import math
+import mmap
+import multiprocessing
+import os
+import pickle
+import random
+import re
+import signal
+import socket
+import stat
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict, List
-from urllib.parse import urlparse
-from urllib.request import urlopen
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Tuple
+from urllib.parse import unquote, urlparse
 
-import mcp.server.stdio
-import mcp.types as types
-import yaml
-from mcp.server import NotificationOptions, Server
-from mcp.server.models import InitializationOptions
+# Start of the "imports" startup phase, which leaves out the few milliseconds
+# the standard library imports above take
+_MODULE_START = time.perf_counter()
+
+# The MCP SDK, yaml and other heavy or optional modules are imported where
+# they are first needed, so --help, daemon shims and JSON specs start fast
+
+try:
+    import orjson
+except ImportError:  # optional faster JSON decoder
+    orjson = None
+
+if TYPE_CHECKING:
+    from mcp.server.models import InitializationOptions
+
+HTTP_METHODS = ("get", "post", "put", "delete", "patch")
+DEFAULT_SEARCH_LIMIT = 50
+DEFAULT_LIST_LIMIT = 200
+DEFAULT_MAX_RESPONSE_BYTES = 100_000
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_LOAD_PROCESSES = os.cpu_count() or 1
+DEFAULT_SPEC_MEMORY_BYTES = 0
+DEFAULT_READY_TIMEOUT = 30.0
+DEFAULT_STREAM_MIN_BYTES = 32_000_000
+PROGRESS_INTERVAL = 1.0
+DEFAULT_RESPONSE_CACHE_BYTES = 32 * 1024 * 1024
+CACHE_STATS_INTERVAL = 60.0
+DEFAULT_HTTP_HOST = "127.0.0.1"
+DEFAULT_HTTP_PORT = 8000
+DEFAULT_HTTP_KEEP_ALIVE = 30
+HTTP_SHUTDOWN_TIMEOUT = 10
+DEFAULT_DAEMON_IDLE_TIMEOUT = 600
+DAEMON_START_TIMEOUT = 300
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+WATCH_POLL_INTERVAL = 1.0
+WATCH_DEBOUNCE_MS = 300
+DEFAULT_FETCH_TIMEOUT = 30.0
+DEFAULT_FETCH_RETRIES = 3
+FETCH_BACKOFF = 0.5
+FETCH_MAX_BACKOFF = 10.0
+
+TRUNCATION_NOTE = (
+    'Subtrees were replaced by {"$handle": ...} placeholders to fit the response '
+    'size budget, and entries past the budget by one "$rest" placeholder; pass a '
+    "handle to the expand tool to retrieve them."
+)
+
+OUTPUT_FORMATS = ("json", "json-compact", "yaml", "typescript")
+
+# Tools that cover every hosted spec when called without a spec argument
+CROSS_SPEC_TOOLS = (
+    "search_endpoints",
+    "match_endpoint",
+    "search_schemas",
+    "list_specs",
+)
+
+# Tools answered from the search indexes and endpoint tables alone, which
+# evicted specs keep
+INDEX_ONLY_TOOLS = (
+    "search_endpoints",
+    "search_schemas",
+    "list_all_endpoints",
+    "list_specs",
+)
+
+FORMAT_PROPERTY = {
+    "format": {
+        "type": "string",
+        "enum": list(OUTPUT_FORMATS),
+        "description": "Response format (default: server setting); typescript "
+        "renders schemas as type declarations",
+    }
+}
+
+MAX_BYTES_PROPERTY = {
+    "max_bytes": {
+        "type": "integer",
+        "description": "Approximate response size budget in bytes "
+        "(default: server setting, 0 for unlimited)",
+    }
+}
+
+PAGING_PROPERTIES = {
+    "limit": {
+        "type": "integer",
+        "description": f"Maximum number of results (default {DEFAULT_SEARCH_LIMIT})",
+        "minimum": 0,
+    },
+    "offset": {
+        "type": "integer",
+        "description": "Number of ranked results to skip (default 0)",
+        "minimum": 0,
+    },
+}
+
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+_WORD_PART_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|[0-9]+")
+
+
+_cancel_event: contextvars.ContextVar[threading.Event | None] = contextvars.ContextVar(
+    "_cancel_event", default=None
+)
+
+# (index, generation) a tool call started with, so it keeps reading the same
+# snapshot even if a reload publishes a new one while it runs
+_pinned_snapshot: contextvars.ContextVar[Tuple[Any, int] | None] = (
+    contextvars.ContextVar("_pinned_snapshot", default=None)
+)
+
+
+class ToolCancelled(Exception):
+    """Raised in a worker when the MCP request running there was cancelled"""
+
+
+def check_cancelled():
+    """Stop the current tool call if its MCP request has been cancelled
+
+    Long-running loops call this periodically; it is a no-op outside of a
+    tool call running on the worker pool.
+    """
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise ToolCancelled()
+
+
+class StartupProfile:
+    """Time spent in each startup phase, printed by --startup-profile
+
+    Phase times are summed over all specs, so with several specs loading in
+    parallel they can add up to more than the elapsed time. Milestones are
+    seconds since main.py started being imported.
+    """
+
+    PHASES = (
+        "imports",
+        "fetch",
+        "bundle",
+        "snapshot",
+        "parse",
+        "index",
+        "worker processes",
+    )
+    MILESTONES = ("transport ready", "specs loaded")
+
+    def __init__(self):
+        self.enabled = False
+        self.phases: Dict[str, float] = {}
+        self.milestones: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def mark(self, milestone: str):
+        """Record a milestone the first time it is reached, then print the
+        profile once every milestone has been reached"""
+        with self._lock:
+            if milestone in self.milestones:
+                return
+            self.milestones[milestone] = time.perf_counter() - _MODULE_START
+            complete = len(self.milestones) == len(self.MILESTONES)
+        if complete and self.enabled:
+            print(self.report(), file=sys.stderr, flush=True)
+
+    def report(self) -> str:
+        lines = ["Startup profile (seconds):"]
+        for name in self.PHASES:
+            lines.append(f"  {name:<18} {self.phases.get(name, 0.0):8.3f}")
+        for name in self.MILESTONES:
+            lines.append(
+                f"  {name:<18} {self.milestones.get(name, 0.0):8.3f}  (elapsed)"
+            )
+        return "\n".join(lines)
+
+
+startup_profile = StartupProfile()
+
+
+def tokenize(text: str, compound: bool = True) -> List[str]:
+    """Split text into lowercase search tokens
+
+    Words are split on non-alphanumeric characters and on camelCase/digit
+    boundaries, so "/users/{userId}" yields "users", "user" and "id".
+
+    Args:
+        text: The text to tokenize
+        compound: Also emit the unsplit word (e.g. "userid") next to its parts
+
+    Returns:
+        List of tokens in text order
+    """
+    tokens = []
+    for word in _WORD_RE.findall(text):
+        parts = _WORD_PART_RE.findall(word)
+        if len(parts) > 1:
+            if compound:
+                tokens.append(word.lower())
+            tokens.extend(part.lower() for part in parts)
+        else:
+            tokens.append(word.lower())
+    return tokens
+
+
+def iter_operations(spec: Mapping):
+    """Yield (path, method, details) for every operation in the spec"""
+    paths = spec.get("paths") if isinstance(spec, Mapping) else None
+    if not isinstance(paths, Mapping):
+        return
+    for path, methods in paths.items():
+        if isinstance(methods, Mapping):
+            for method, details in methods.items():
+                if method in HTTP_METHODS and isinstance(details, dict):
+                    yield path, method, details
+
+
+def schema_definitions(spec: Mapping) -> Tuple[Mapping, str]:
+    """Return the schema definitions of the spec and their $ref prefix
+
+    Supports both OpenAPI 3.0 (components/schemas) and Swagger 2.0 (definitions).
+    """
+    if "components" in spec and "schemas" in spec["components"]:
+        return spec["components"]["schemas"], "#/components/schemas/"
+    elif "definitions" in spec:
+        return spec["definitions"], "#/definitions/"
+    return {}, ""
+
+
+class InvertedIndex:
+    """BM25-ranked token index over a fixed set of documents
+
+    Documents are identified by their insertion order. Every query token must
+    match; query tokens are matched as prefixes of indexed tokens, so "user"
+    finds "users" too, with prefix matches scored lower than exact ones.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    PREFIX_BOOST = 0.5
+
+    def __init__(self):
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.lengths: List[int] = []
+        self._terms: List[str] = []
+        self._avg_length = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.lengths)
+
+    def add(self, *fields: str) -> int:
+        """Index a document made of the given text fields and return its id"""
+        doc_id = len(self.lengths)
+        length = 0
+        for field in fields:
+            for token in tokenize(field):
+                docs = self.postings.setdefault(token, {})
+                docs[doc_id] = docs.get(doc_id, 0) + 1
+                length += 1
+        self.lengths.append(length)
+        return doc_id
+
+    def finalize(self):
+        """Precompute lookup state, call after the last add()"""
+        self._terms = sorted(self.postings)
+        self._avg_length = (
+            sum(self.lengths) / len(self.lengths) if self.lengths else 0.0
+        )
+
+    def _expand(self, prefix: str) -> List[str]:
+        """Return every indexed token starting with prefix"""
+        terms = []
+        i = bisect_left(self._terms, prefix)
+        while i < len(self._terms) and self._terms[i].startswith(prefix):
+            terms.append(self._terms[i])
+            i += 1
+        return terms
+
+    def _score(self, query_tokens: set[str]) -> Dict[int, float]:
+        """BM25 scores of the documents matching every query token"""
+        n_docs = self.size
+        scores: Dict[int, float] = {}
+        matches: set[int] | None = None
+        for query_token in query_tokens:
+            # Each query token contributes its best-scoring indexed term per document
+            token_scores: Dict[int, float] = {}
+            for term in self._expand(query_token):
+                check_cancelled()
+                docs = self.postings[term]
+                idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                if term != query_token:
+                    idf *= self.PREFIX_BOOST
+                for doc_id, tf in docs.items():
+                    norm = self.K1 * (
+                        1 - self.B + self.B * self.lengths[doc_id] / self._avg_length
+                    )
+                    score = idf * tf * (self.K1 + 1) / (tf + norm)
+                    if score > token_scores.get(doc_id, 0.0):
+                        token_scores[doc_id] = score
+            matches = (
+                set(token_scores) if matches is None else matches & token_scores.keys()
+            )
+            if not matches:
+                return {}
+            for doc_id, score in token_scores.items():
+                scores[doc_id] = scores.get(doc_id, 0.0) + score
+        return {doc_id: scores[doc_id] for doc_id in matches or ()}
+
+    def search(
+        self, query: str, limit: int, offset: int = 0
+    ) -> List[Tuple[int, float]]:
+        """Return (doc_id, score) pairs for the best matches, highest score first
+
+        Only the top offset + limit documents are kept in a heap, so the full
+        match set is never sorted. An empty query lists documents in order.
+        """
+        query_tokens = set(tokenize(query, compound=False))
+        if not query_tokens:
+            return [
+                (doc_id, 0.0)
+                for doc_id in range(offset, min(offset + limit, self.size))
+            ]
+
+        scores = self._score(query_tokens)
+        top = heapq.nlargest(
+            offset + limit, scores.items(), key=lambda item: (item[1], -item[0])
+        )
+        return top[offset:]
+
+
+_PATH_PARAM_RE = re.compile(r"\{([^{}/]+)\}")
+
+
+def server_base_paths(spec: Mapping) -> List[str]:
+    """Return the path prefixes of the spec's servers (or Swagger 2.0 basePath)
+
+    Longest first, so they can be stripped from concrete URLs before matching.
+    """
+    urls = [
+        server.get("url", "")
+        for server in spec.get("servers") or []
+        if isinstance(server, dict)
+    ]
+    if spec.get("basePath"):
+        urls.append(spec["basePath"])
+    base_paths = {
+        urlparse(url).path.rstrip("/") for url in urls if isinstance(url, str)
+    }
+    return sorted((p for p in base_paths if p), key=len, reverse=True)
+
+
+class PathTrieNode:
+    """A path segment position in PathTrie"""
+
+    def __init__(self):
+        self.literals: Dict[str, "PathTrieNode"] = {}
+        # Segments mixing literals and params, e.g. "{name}.json"
+        self.patterns: List[Tuple[re.Pattern, "PathTrieNode"]] = []
+        self.param: "PathTrieNode | None" = None
+        # method -> path template ending at this node
+        self.operations: Dict[str, str] = {}
+
+
+class PathTrie:
+    """Trie of path template segments for matching concrete paths to operations
+
+    Each segment is a literal edge, a whole-segment {param} edge, or a
+    pattern edge for segments mixing both. Matching prefers literal over
+    pattern over param edges and backtracks only on dead ends, so a lookup
+    costs O(path segments) in practice.
+    """
+
+    def __init__(self):
+        self.root = PathTrieNode()
+
+    @staticmethod
+    def split(path: str) -> List[str]:
+        return [segment for segment in path.split("/") if segment]
+
+    @staticmethod
+    def segment_regex(segment: str) -> str:
+        """Regex matching a template segment like "{name}.json", one group per param"""
+        return "".join(
+            "([^/]+?)" if i % 2 else re.escape(part)
+            for i, part in enumerate(_PATH_PARAM_RE.split(segment))
+        )
+
+    def insert(self, template: str, method: str):
+        node = self.root
+        for segment in self.split(template):
+            names = _PATH_PARAM_RE.findall(segment)
+            if not names:
+                node = node.literals.setdefault(segment, PathTrieNode())
+            elif segment == f"{{{names[0]}}}":
+                if node.param is None:
+                    node.param = PathTrieNode()
+                node = node.param
+            else:
+                regex = self.segment_regex(segment)
+                for pattern, child in node.patterns:
+                    if pattern.pattern == regex:
+                        node = child
+                        break
+                else:
+                    child = PathTrieNode()
+                    node.patterns.append((re.compile(regex), child))
+                    node = child
+        node.operations.setdefault(method, template)
+
+    def match(self, path: str):
+        """Yield the operations (method -> template) of the nodes matching a
+        concrete path, best match first"""
+        segments = self.split(path)
+        # Depth-first with literal edges explored first
+        stack = [(self.root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if depth == len(segments):
+                if node.operations:
+                    yield node.operations
+                continue
+            segment = segments[depth]
+            if node.param is not None:
+                stack.append((node.param, depth + 1))
+            for pattern, child in reversed(node.patterns):
+                if pattern.fullmatch(segment):
+                    stack.append((child, depth + 1))
+            child = node.literals.get(segment)
+            if child is not None:
+                stack.append((child, depth + 1))
+
+    @classmethod
+    def extract_params(cls, template: str, path: str) -> Dict[str, str]:
+        """Return the values of the template's params in a concrete path it matches"""
+        params = {}
+        for template_segment, segment in zip(cls.split(template), cls.split(path)):
+            names = _PATH_PARAM_RE.findall(template_segment)
+            if not names:
+                continue
+            match = re.fullmatch(cls.segment_regex(template_segment), segment)
+            if match:
+                params.update(zip(names, (unquote(v) for v in match.groups())))
+        return params
+
+
+def deep_sizeof(root: Any) -> int:
+    """Approximate the memory held by an object graph, counting shared objects once"""
+    seen = set()
+    stack = [root]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+    return total
+
+
+class SpecIndex:
+    """Lookup structures derived from a loaded spec, built once at load time"""
+
+    def __init__(self, spec: Mapping):
+        self.spec = spec
+        self.endpoints: List[Dict] = []
+        self.endpoint_index = InvertedIndex()
+        self.path_trie = PathTrie()
+        self.base_paths = server_base_paths(spec)
+
+        for path, method, details in iter_operations(spec):
+            summary = details.get("summary") or ""
+            tags = details.get("tags") or []
+            self.endpoints.append(
+                {
+                    "path": path,
+                    "method": method.upper(),
+                    "summary": summary,
+                    "tags": tags,
+                }
+            )
+            self.path_trie.insert(path, method.upper())
+            self.endpoint_index.add(
+                path,
+                summary,
+                details.get("description") or "",
+                " ".join(str(tag) for tag in tags),
+                details.get("operationId") or "",
+            )
+        self.endpoint_index.finalize()
+
+        # Endpoint ids sorted by (path, method), overall and per tag/method
+        # filter combination, so list pages are slices of a precomputed array
+        operation_order = sorted(
+            range(len(self.endpoints)),
+            key=lambda i: (self.endpoints[i]["path"], self.endpoints[i]["method"]),
+        )
+        self.operation_tables: Dict[Tuple[str | None, str | None], List[int]] = {}
+        for endpoint_id in operation_order:
+            endpoint = self.endpoints[endpoint_id]
+            tags = [None] + [str(tag).lower() for tag in endpoint["tags"]]
+            for tag in dict.fromkeys(tags):
+                for method in (None, endpoint["method"]):
+                    self.operation_tables.setdefault((tag, method), []).append(
+                        endpoint_id
+                    )
+
+        self.schemas: List[Dict] = []
+        self.schema_index = InvertedIndex()
+        schemas, prefix = schema_definitions(spec)
+        for schema_name, schema_def in schemas.items():
+            description = ""
+            if isinstance(schema_def, dict):
+                description = schema_def.get("description", schema_def.get("title", ""))
+            self.schemas.append(
+                {
+                    "name": schema_name,
+                    "ref": f"{prefix}{schema_name}",
+                    "description": description,
+                    "type": schema_def.get("type", "object")
+                    if isinstance(schema_def, dict)
+                    else "unknown",
+                }
+            )
+            self.schema_index.add(schema_name)
+        self.schema_index.finalize()
+
+        # $ref -> resolved schema and $ref -> $refs it uses, filled lazily by
+        # OpenAPIServer.resolve_schema_ref
+        self.resolved_refs: Dict[str, Any] = {}
+        self.ref_edges: Dict[str, List[str]] = {}
+        self._resident_bytes: int | None = None
+
+    @property
+    def resident_bytes(self) -> int:
+        """Memory held by the spec body, measured on first use
+
+        Only the body counts, as that is what SpecSource.evict() releases;
+        the search indexes and endpoint tables stay resident.
+        """
+        if self._resident_bytes is None:
+            self._resident_bytes = (
+                deep_sizeof(self.spec) if self.spec is not None else 0
+            )
+        return self._resident_bytes
+
+    def without_spec(self) -> "SpecIndex":
+        """Return a copy keeping the indexes but not the spec body or resolved refs"""
+        stub = copy.copy(self)
+        stub.spec = None
+        stub.resolved_refs = {}
+        stub.ref_edges = {}
+        stub._resident_bytes = 0
+        return stub
+
+
+class ParserBackend:
+    """A YAML or JSON decoder that can turn raw spec content into a dict
+
+    available may be a callable, checked (and its imports paid for) only
+    when a backend for the format is first needed.
+    """
+
+    def __init__(
+        self, name: str, fmt: str, load, available: bool | Callable[[], bool] = True
+    ):
+        self.name = name
+        self.format = fmt
+        self.load = load
+        self._available = available
+
+    @property
+    def available(self) -> bool:
+        if not isinstance(self._available, bool):
+            self._available = self._available()
+        return self._available
+
+
+def _libyaml_available() -> bool:
+    import yaml
+
+    return hasattr(yaml, "CSafeLoader")
+
+
+def _load_orjson(content: bytes | str) -> Any:
+    if orjson is None:
+        raise ImportError("orjson is not installed")
+    return orjson.loads(content)
+
+
+def _load_libyaml(content: bytes | str) -> Any:
+    import yaml
+
+    return yaml.load(content, Loader=yaml.CSafeLoader)
+
+
+def _load_pyyaml(content: bytes | str) -> Any:
+    import yaml
+
+    return yaml.safe_load(content)
+
+
+PARSER_BACKENDS = [
+    # Fastest first within each format
+    ParserBackend("orjson", "json", _load_orjson, available=orjson is not None),
+    ParserBackend("json", "json", json.loads),
+    ParserBackend("libyaml", "yaml", _load_libyaml, available=_libyaml_available),
+    ParserBackend("pyyaml", "yaml", _load_pyyaml),
+]
+
+
+def parser_backends(fmt: str) -> List[ParserBackend]:
+    """Return the available backends for "json" or "yaml", fastest first"""
+    return [b for b in PARSER_BACKENDS if b.format == fmt and b.available]
+
+
+def parse_document(content: bytes | str, fmt: str) -> Any:
+    """Parse spec content with the fastest available backend for its format
+
+    If a fast backend rejects the document (e.g. orjson on integers wider than
+    64 bits) the next backend is tried; the last backend's error is raised.
+    """
+    logger = logging.getLogger(__name__)
+    backends = parser_backends(fmt)
+    for i, backend in enumerate(backends):
+        start = time.perf_counter()
+        try:
+            with startup_profile.phase("parse"):
+                document = backend.load(content)
+        except Exception as e:
+            if i == len(backends) - 1:
+                raise
+            logger.debug(f"{backend.name} failed to parse spec, falling back: {e}")
+            continue
+        logger.info(
+            f"Parsed {len(content)} bytes of {fmt.upper()} with {backend.name} "
+            f"in {time.perf_counter() - start:.3f}s"
+        )
+        return document
+    raise ValueError(f"No parser backend available for {fmt}")
+
+
+def escape_pointer_token(token: Any) -> str:
+    """Escape a key for use as a JSON pointer token (RFC 6901)"""
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def unescape_pointer_token(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+class ResponseBudget:
+    """Trims a JSON-like value to a byte budget
+
+    Subtrees that do not fit are replaced by {"$handle": ..., "$bytes": ...}
+    placeholders, where the handle is the JSON pointer of the subtree below
+    the handle of the value being trimmed, so it can be expanded later. Once
+    a container's budget is spent, its remaining entries are collapsed into a
+    single {"$handle": "<pointer>?from=<i>", "$bytes": ..., "$count": ...}
+    placeholder (under the "$rest" key in objects) rather than one each.
+    Placeholders count against the budget and never replace a value smaller
+    than themselves, so a trimmed value stays within the budget unless the
+    budget is too small for anything but one placeholder.
+
+    Sizes are those of the value serialized as JSON and are approximate;
+    they are computed once per distinct (possibly shared) container. Subtrees
+    nested deeper than MAX_DEPTH are replaced by handles as well.
+    """
+
+    PLACEHOLDER_BYTES = 64
+    MAX_DEPTH = 64
+    REST_KEY = "$rest"
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.truncated = False
+        # id(container) -> (JSON size, nesting depth)
+        self._measures: Dict[int, Tuple[int, int]] = {}
+
+    @staticmethod
+    def _scalar_size(value: Any) -> int:
+        if isinstance(value, str):
+            return len(value) + 2
+        return len(json.dumps(value, default=str))
+
+    def _measure(self, obj: Any) -> Tuple[int, int]:
+        """Approximate JSON size and nesting depth of obj, without recursion"""
+        if not isinstance(obj, (dict, list)):
+            return self._scalar_size(obj), 0
+
+        measures = self._measures
+        stack = [(obj, False)]
+        while stack:
+            check_cancelled()
+            node, children_done = stack.pop()
+            if id(node) in measures:
+                continue
+            children = list(node.values()) if isinstance(node, dict) else node
+            if not children_done:
+                stack.append((node, True))
+                stack.extend(
+                    (child, False)
+                    for child in children
+                    if isinstance(child, (dict, list)) and id(child) not in measures
+                )
+                continue
+            size = 2 + 2 * max(len(node) - 1, 0)
+            depth = 1
+            if isinstance(node, dict):
+                size += sum(self._scalar_size(str(key)) + 2 for key in node)
+            for child in children:
+                if isinstance(child, (dict, list)):
+                    child_size, child_depth = measures[id(child)]
+                    size += child_size
+                    depth = max(depth, child_depth + 1)
+                else:
+                    size += self._scalar_size(child)
+            measures[id(node)] = (size, depth)
+        return measures[id(obj)]
+
+    def size(self, obj: Any) -> int:
+        return self._measure(obj)[0]
+
+    def _placeholder(self, handle: str, size: int, count: int | None = None) -> Dict:
+        placeholder: Dict[str, Any] = {"$handle": handle, "$bytes": size}
+        if count is not None:
+            placeholder["$count"] = count
+        self._measures[id(placeholder)] = (
+            len(json.dumps(placeholder, default=str)),
+            1,
+        )
+        return placeholder
+
+    def apply(self, obj: Any, handle: str, start: int = 0) -> Any:
+        """Return obj, or a trimmed copy of it if it exceeds the budget
+
+        Args:
+            obj: The value to trim
+            handle: JSON pointer of obj, the prefix of the handles left in it
+            start: Position of obj's first entry in the value handle points
+                to, when obj is the tail of a list or object
+        """
+        if self.max_bytes <= 0:
+            return obj
+        return self._trim(obj, handle, self.max_bytes, 0, start)
+
+    def _trim(
+        self, obj: Any, handle: str, budget: int, level: int, start: int = 0
+    ) -> Any:
+        size, depth = self._measure(obj)
+        if size <= budget and level + depth <= self.MAX_DEPTH:
+            return obj
+
+        placeholder = self._placeholder(handle, size)
+        if self.size(placeholder) >= size and level + depth <= self.MAX_DEPTH:
+            return obj  # a placeholder would not save anything
+        self.truncated = True
+        if (
+            not isinstance(obj, (dict, list))
+            or not obj
+            or level >= self.MAX_DEPTH
+            or budget < 2 * self.size(placeholder)
+        ):
+            return placeholder
+
+        # Keep entries in order while they fit, descend into those that don't
+        # and collapse the rest once the budget is spent, always keeping room
+        # for the collapsed placeholder
+        entries = list(obj.items()) if isinstance(obj, dict) else list(enumerate(obj))
+        rest_key_size = (
+            self._scalar_size(self.REST_KEY) + 2 if isinstance(obj, dict) else 0
+        )
+        reserve = (
+            2
+            + rest_key_size
+            + self.size(
+                self._placeholder(
+                    f"{handle}?from={start + len(entries)}", size, len(entries)
+                )
+            )
+        )
+        remaining = budget - 2
+        kept = []
+        for position, (key, value) in enumerate(entries):
+            key_size = self._scalar_size(str(key)) + 4 if isinstance(obj, dict) else 2
+            last = position == len(entries) - 1
+            room = remaining - key_size - (0 if last else reserve)
+            value_size, value_depth = self._measure(value)
+            if value_size <= room and level + 1 + value_depth <= self.MAX_DEPTH:
+                kept.append((key, value))
+                remaining -= key_size + value_size
+                continue
+
+            child_key = key if isinstance(obj, dict) else start + key
+            child_handle = f"{handle}/{escape_pointer_token(child_key)}"
+            if (
+                isinstance(value, (dict, list))
+                and value
+                and level + 1 < self.MAX_DEPTH
+                and room >= 2 * self.size(self._placeholder(child_handle, value_size))
+            ):
+                child = self._trim(value, child_handle, room, level + 1)
+                kept.append((key, child))
+                remaining -= key_size + self.size(child)
+                continue
+
+            rest = entries[position:]
+            rest_size = sum(
+                self._measure(v)[0]
+                + (self._scalar_size(str(k)) + 4 if isinstance(obj, dict) else 2)
+                for k, v in rest
+            )
+            rest_placeholder = self._placeholder(
+                f"{handle}?from={start + position}", rest_size, len(rest)
+            )
+            if rest_size <= self.size(rest_placeholder) + rest_key_size:
+                kept.extend(rest)  # fits in the room kept for the placeholder
+            elif isinstance(obj, dict):
+                kept.append((self.REST_KEY, rest_placeholder))
+            else:
+                kept.append((None, rest_placeholder))
+            break
+
+        if isinstance(obj, dict):
+            return dict(kept)
+        return [value for _, value in kept]
+
+
+# (spec name, generation) of every spec a tool call reads
+Generations = Tuple[Tuple[str, int], ...]
+CacheKey = Tuple[str, str, Generations]
+
+
+class ResponseCache:
+    """Bounded LRU cache of encoded tool responses
+
+    Keys are (tool, normalized arguments, generations of the specs read), so
+    entries for a replaced spec are never hit again and age out. Entries are evicted least
+    recently used first once the cached text exceeds max_bytes, counted in
+    UTF-8 bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Text and its UTF-8 size, by key
+        self._entries: OrderedDict[CacheKey, Tuple[str, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(name: str, arguments: dict | None, generations: Generations) -> CacheKey:
+        normalized = json.dumps(arguments or {}, sort_keys=True, separators=(",", ":"))
+        return name, normalized, generations
+
+    def get(self, key: CacheKey) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: CacheKey, text: str):
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous[1]
+            self._entries[key] = (text, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+@functools.cache
+def _no_alias_dumper() -> type:
+    """YAML dumper that repeats shared subtrees instead of emitting &anchors"""
+    import yaml
+
+    base: Any = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+    class NoAliasDumper(base):
+        def ignore_aliases(self, data):
+            return True
+
+    return NoAliasDumper
+
+
+def encode_json(obj: Any, compact: bool = False) -> str:
+    """Serialize obj as indented (or minified) JSON, with orjson when installed"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (0 if compact else orjson.OPT_INDENT_2)
+        try:
+            return orjson.dumps(obj, option=option, default=str).decode("utf-8")
+        except orjson.JSONEncodeError:
+            pass  # e.g. nesting deeper than orjson supports
+    if compact:
+        return json.dumps(obj, separators=(",", ":"), default=str)
+    return json.dumps(obj, indent=2, default=str)
+
+
+_TS_IDENTIFIER_RE = re.compile(r"^[A-Za-z_$][A-Za-z0-9_$]*$")
+_TS_PRIMITIVES = {
+    "string": "string",
+    "integer": "number",
+    "number": "number",
+    "boolean": "boolean",
+    "null": "null",
+}
+
+
+def typescript_type(schema: Any, indent: str = "") -> str:
+    """Render a resolved JSON schema as a TypeScript-like type expression"""
+    if not isinstance(schema, dict):
+        return "unknown"
+    if "$handle" in schema:
+        return f"unknown /* $handle: {schema['$handle']} */"
+    if "$ref" in schema:
+        return str(schema["$ref"]).rsplit("/", 1)[-1]
+    if "error" in schema and len(schema) == 1:
+        return f"unknown /* {schema['error']} */"
+
+    for keyword, joiner in (("oneOf", " | "), ("anyOf", " | "), ("allOf", " & ")):
+        if isinstance(schema.get(keyword), list):
+            parts = [typescript_type(s, indent) for s in schema[keyword]]
+            rendered = joiner.join(p if " " not in p else f"({p})" for p in parts)
+            break
+    else:
+        if isinstance(schema.get("enum"), list):
+            rendered = " | ".join(json.dumps(v, default=str) for v in schema["enum"])
+        else:
+            rendered = _typescript_typed(schema, indent)
+
+    if schema.get("nullable") and rendered != "null":
+        rendered = f"{rendered} | null"
+    return rendered
+
+
+def _typescript_typed(schema: Dict, indent: str) -> str:
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        return " | ".join(
+            _typescript_typed({**schema, "type": t}, indent) for t in schema_type
+        )
+    if schema_type == "array" or "items" in schema:
+        item = typescript_type(schema.get("items"), indent)
+        return f"({item})[]" if " " in item else f"{item}[]"
+    if schema_type in _TS_PRIMITIVES:
+        rendered = _TS_PRIMITIVES[schema_type]
+        if schema.get("format"):
+            rendered += f" /* {schema['format']} */"
+        return rendered
+    if schema_type == "object" or "properties" in schema:
+        return _typescript_object(schema, indent)
+    return "unknown"
+
+
+def _typescript_object(schema: Dict, indent: str) -> str:
+    properties = schema.get("properties")
+    additional = schema.get("additionalProperties")
+    if not isinstance(properties, dict):
+        properties = {}
+    if not properties and not additional:
+        return "object"
+
+    inner = indent + "  "
+    required = (
+        schema.get("required") if isinstance(schema.get("required"), list) else []
+    )
+    lines = ["{"]
+    for name, prop in properties.items():
+        description = prop.get("description") if isinstance(prop, dict) else None
+        if isinstance(description, str) and description:
+            lines.append(f"{inner}/** {' '.join(description.split())} */")
+        key = name if _TS_IDENTIFIER_RE.match(str(name)) else json.dumps(str(name))
+        optional = "" if name in required else "?"
+        lines.append(f"{inner}{key}{optional}: {typescript_type(prop, inner)};")
+    if additional:
+        value = "unknown" if additional is True else typescript_type(additional, inner)
+        lines.append(f"{inner}[key: string]: {value};")
+    lines.append(f"{indent}}}")
+    return "\n".join(lines)
+
+
+def typescript_declaration(name: str, schema: Any, comments: List[str | None]) -> str:
+    """Render a named schema as a TypeScript-like type declaration"""
+    identifier = re.sub(r"[^A-Za-z0-9_$]", "_", name) or "Schema"
+    if not _TS_IDENTIFIER_RE.match(identifier):
+        identifier = f"_{identifier}"
+    header = [f"// {comment}" for comment in comments if comment]
+    if isinstance(schema, dict):
+        description = schema.get("description") or schema.get("title")
+        if isinstance(description, str) and description:
+            header.append(f"/** {' '.join(description.split())} */")
+    return "\n".join(header + [f"type {identifier} = {typescript_type(schema)};"])
+
+
+def encode_response(result: Any, fmt: str) -> str:
+    """Serialize a tool result in one of OUTPUT_FORMATS
+
+    The "typescript" format renders get_schema and expand results as type
+    declarations; other results fall back to minified JSON.
+    """
+    if fmt == "json-compact":
+        return encode_json(result, compact=True)
+    if fmt == "yaml":
+        import yaml
+
+        return yaml.dump(
+            result,
+            Dumper=_no_alias_dumper(),
+            sort_keys=False,
+            allow_unicode=True,
+            width=120,
+        )
+    if fmt == "typescript" and isinstance(result, dict):
+        if "schema" in result and "name" in result:
+            return typescript_declaration(
+                str(result["name"]),
+                result["schema"],
+                [result.get("ref"), result.get("note")],
+            )
+        if "value" in result and "handle" in result:
+            name = unescape_pointer_token(str(result["handle"]).rsplit("/", 1)[-1])
+            return typescript_declaration(
+                name, result["value"], [result["handle"], result.get("note")]
+            )
+    if fmt == "typescript":
+        return encode_json(result, compact=True)
+    return encode_json(result)
+
+
+def default_cache_dir() -> Path:
+    """Return the per-user cache directory for compiled spec snapshots"""
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "openapi-spec-mcp"
+
+
+def is_url(path: str) -> bool:
+    """Check if the path is a URL"""
+    return urlparse(path).scheme in ("http", "https")
+
+
+BUNDLE_SUFFIX = ".bundle"
+SPEC_FILE_SUFFIXES = (".yaml", ".yml", ".json", BUNDLE_SUFFIX)
+_SPEC_NAME_RE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def spec_name(location: str) -> str:
+    """Derive a spec name from a file path or URL, e.g. billing for billing.yaml"""
+    if is_url(location):
+        parsed = urlparse(location)
+        stem = Path(parsed.path).stem
+        if stem and stem not in ("openapi", "swagger"):
+            return stem
+        return parsed.hostname or "spec"
+    return Path(location).stem
+
+
+def expand_spec_locations(items: List[str]) -> Dict[str, str]:
+    """Expand spec arguments into an ordered name -> location mapping
+
+    Each item is a file path, URL, directory (every YAML/JSON file or bundle
+    directly inside it) or glob pattern, optionally prefixed with NAME= to choose the
+    spec's name. Otherwise names come from file names, with -2, -3... added
+    to tell apart files that share one.
+
+    Raises:
+        ValueError: if a named item matches more than one file
+    """
+    specs: Dict[str, str] = {}
+    for item in items:
+        name, sep, location = item.partition("=")
+        if not sep or not _SPEC_NAME_RE.match(name):
+            name, location = None, item
+
+        if is_url(location):
+            locations = [location]
+        elif Path(location).is_dir():
+            locations = sorted(
+                str(path)
+                for path in Path(location).iterdir()
+                if path.suffix.lower() in SPEC_FILE_SUFFIXES
+            )
+        elif glob.has_magic(location):
+            locations = sorted(glob.glob(location, recursive=True))
+        else:
+            locations = [location]
+
+        if name and len(locations) != 1:
+            raise ValueError(
+                f"{item} must name exactly one spec, matched {len(locations)}"
+            )
+        for location in locations:
+            base = name or spec_name(location)
+            unique, suffix = base, 2
+            while unique in specs:
+                unique, suffix = f"{base}-{suffix}", suffix + 1
+            specs[unique] = location
+    return specs
+
+
+def read_spec_config(config_path: Path) -> List[str]:
+    """Read spec arguments from a YAML or JSON config file
+
+    The file holds a "specs" key with either a list of locations or a mapping
+    of names to locations, relative to the config file's directory::
+
+        specs:
+          billing: ./billing/openapi.yaml
+          users: https://users.internal/openapi.json
+    """
+    import yaml
+
+    with open(config_path, "rb") as f:
+        config = yaml.safe_load(f) or {}
+    entries = config.get("specs", [])
+
+    def resolve(location: str) -> str:
+        if is_url(location):
+            return location
+        return str(config_path.parent / os.path.expanduser(location))
+
+    if isinstance(entries, dict):
+        return [f"{name}={resolve(location)}" for name, location in entries.items()]
+    return [resolve(location) for location in entries]
+
+
+def daemon_socket_path(specs: Dict[str, str]) -> Path:
+    """Return the Unix socket a shared daemon for these specs listens on
+
+    Sockets live in a private per-user directory, named by a hash of the
+    spec names and locations so every shim for the same specs finds the same
+    daemon. Without XDG_RUNTIME_DIR the directory is created in the shared
+    temporary directory, where it must be a real directory owned by the
+    user and private to them.
+
+    Raises:
+        PermissionError: if that directory fails those checks
+    """
+    source = "\n".join(
+        f"{name}={location if is_url(location) else Path(location).resolve()}"
+        for name, location in specs.items()
+    )
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        base = Path(runtime_dir) / "openapi-spec-mcp"
+    else:
+        base = Path(tempfile.gettempdir()) / f"openapi-spec-mcp-{os.getuid()}"
+    base.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if not runtime_dir:
+        info = base.lstat()
+        if (
+            not stat.S_ISDIR(info.st_mode)
+            or info.st_uid != os.getuid()
+            or stat.S_IMODE(info.st_mode) != 0o700
+        ):
+            raise PermissionError(
+                f"Refusing to use {base} for daemon sockets: it is not a directory "
+                "private to the current user"
+            )
+    digest = hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+    return base / f"{digest}.sock"
+
+
+def _open_append(path: Path, mode: str):
+    """Open path for appending, creating it private to the user, refusing symlinks"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND | os.O_NOFOLLOW, 0o600)
+    return os.fdopen(fd, mode)
+
+
+def _connect_unix(socket_path: Path) -> socket.socket | None:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(str(socket_path))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def connect_daemon(
+    socket_path: Path, daemon_argv: List[str], timeout: float = DAEMON_START_TIMEOUT
+) -> socket.socket:
+    """Connect to the daemon at socket_path, starting it first if needed
+
+    A lock file serialises shims racing to start the same daemon; the losers
+    wait on the lock and then connect to the daemon the winner started. The
+    daemon's log goes to a file next to the socket.
+    """
+    sock = _connect_unix(socket_path)
+    if sock:
+        return sock
+
+    logger = logging.getLogger(__name__)
+    with _open_append(socket_path.with_suffix(".lock"), "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        sock = _connect_unix(socket_path)
+        if sock:
+            return sock
+
+        log_path = socket_path.with_suffix(".log")
+        logger.info(f"Starting daemon on {socket_path} (log: {log_path})")
+        with _open_append(log_path, "ab") as log:
+            process = subprocess.Popen(
+                daemon_argv,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=log,
+                start_new_session=True,
+            )
+        deadline = time.monotonic() + timeout
+        while True:
+            sock = _connect_unix(socket_path)
+            if sock:
+                return sock
+            if process.poll() is not None:
+                raise RuntimeError(
+                    f"Daemon exited with status {process.returncode}, see {log_path}"
+                )
+            if time.monotonic() > deadline:
+                raise TimeoutError(
+                    f"Daemon did not listen on {socket_path} in {timeout}s"
+                )
+            time.sleep(0.05)
+
+
+def run_shim(socket_path: Path, daemon_argv: List[str]):
+    """Proxy MCP frames between stdio and the shared daemon
+
+    Both sides use newline-delimited JSON-RPC, so bytes are copied verbatim
+    without parsing. Closing stdin half-closes the socket, which ends the
+    session on the daemon.
+    """
+    sock = connect_daemon(socket_path, daemon_argv)
+
+    def upstream():
+        try:
+            for line in sys.stdin.buffer:
+                sock.sendall(line)
+        except OSError:
+            pass
+        finally:
+            with contextlib.suppress(OSError):
+                sock.shutdown(socket.SHUT_WR)
+
+    threading.Thread(target=upstream, name="shim-stdin", daemon=True).start()
+    with sock:
+        while chunk := sock.recv(65536):
+            sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+
+
+class SocketLineStream:
+    """Line-oriented file interface over a Unix socket connection
+
+    stdio_server only iterates over lines of its stdin and writes/flushes its
+    stdout, so wrapping a connection in this class lets daemon clients reuse
+    the exact stdio framing.
+    """
+
+    def __init__(self, stream):
+        from anyio.streams.buffered import BufferedByteReceiveStream
+
+        self.stream = stream
+        self.reader = BufferedByteReceiveStream(stream)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        import anyio
+
+        try:
+            line = await self.reader.receive_until(b"\n", MAX_FRAME_BYTES)
+        except (anyio.EndOfStream, anyio.IncompleteRead, anyio.BrokenResourceError):
+            raise StopAsyncIteration
+        return line.decode("utf-8") + "\n"
+
+    async def write(self, text: str):
+        await self.stream.send(text.encode("utf-8"))
+
+    async def flush(self):
+        pass
+
+
+class _SpecUnpickler(pickle.Unpickler):
+    """Unpickler that finds this module's classes under any of its names
+
+    Pickles record the module that wrote them, which is __main__ when run as
+    python main.py but main when run through the openapi-spec-mcp script.
+    """
+
+    def find_class(self, module: str, name: str) -> Any:
+        if module in ("__main__", "__mp_main__", "main"):
+            return getattr(sys.modules[__name__], name)
+        return super().find_class(module, name)
+
+
+class SnapshotCache:
+    """On-disk cache of compiled SpecIndex snapshots for local spec files
+
+    Each source file maps to one snapshot file holding a small header
+    (source path, size, mtime and content hash) followed by the pickled
+    SpecIndex, so a stale entry can be rejected without decoding the payload.
+    A snapshot whose size matches but whose mtime differs is still used when
+    the content hash matches (e.g. after a checkout that only touched the file).
+    """
+
+    # Bump whenever SpecIndex gains or changes attributes
+    SNAPSHOT_VERSION = 7
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.logger = logging.getLogger(__name__)
+
+    def _entry_path(self, source: Path) -> Path:
+        key = hashlib.sha256(str(source.resolve()).encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.snapshot"
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        return hashlib.sha256(content).hexdigest()
+
+    def _is_fresh(self, f, source: Path) -> bool:
+        """Read the header from f and check it against source"""
+        stat = source.stat()
+        header = pickle.load(f)
+        if (
+            header.get("version") != self.SNAPSHOT_VERSION
+            or header.get("source") != str(source.resolve())
+            or header.get("size") != stat.st_size
+        ):
+            return False
+        if header.get("mtime_ns") != stat.st_mtime_ns:
+            return header.get("sha256") == self.content_hash(source.read_bytes())
+        return True
+
+    def is_fresh(self, source: Path) -> bool:
+        """Check whether a usable snapshot exists for source without loading it"""
+        try:
+            with open(self._entry_path(source), "rb") as f:
+                return self._is_fresh(f, source)
+        except Exception:
+            return False
+
+    def load(self, source: Path) -> "SpecIndex | None":
+        """Return the cached SpecIndex for source, or None if missing or stale"""
+        entry = self._entry_path(source)
+        try:
+            with open(entry, "rb") as f:
+                if not self._is_fresh(f, source):
+                    return None
+                return _SpecUnpickler(f).load()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable snapshot {entry}: {e}")
+            return None
+
+    def store(
+        self, source: Path, stat: os.stat_result, content_hash: str, index: "SpecIndex"
+    ):
+        """Write the snapshot for source, given its stat and content hash at parse time"""
+        entry = self._entry_path(source)
+        header = {
+            "version": self.SNAPSHOT_VERSION,
+            "source": str(source.resolve()),
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": content_hash,
+        }
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp_path, entry)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            self.logger.warning(f"Failed to write snapshot {entry}: {e}")
+
+
+BUNDLE_MAGIC = b"OPENAPI-SPEC-MCP-BUNDLE\n"
+# Bump whenever the bundle layout changes
+BUNDLE_VERSION = 2
+# Mapping levels below each top-level spec key that get their own offset
+# table, e.g. paths -> path -> method; anything deeper is decoded as a whole
+BUNDLE_TABLE_LEVELS = {
+    "paths": 2,
+    "components": 2,
+    "definitions": 1,
+    "parameters": 1,
+    "responses": 1,
+}
+
+
+class BundleMapping(Mapping):
+    """Read-only view of a spec subtree stored as pickled blobs
+
+    The blobs live in a memory-mapped bundle or, for streamed specs, an
+    in-memory buffer. Keys come from the offset table. Values are either
+    nested BundleMappings or decoded from the blobs on every access, so only
+    the subtrees being used are held as objects.
+    """
+
+    def __init__(self, data: mmap.mmap | bytearray, base: int, table: Dict):
+        self._data = data
+        self._base = base
+        self._table = table
+
+    def __getitem__(self, key: Any) -> Any:
+        entry = self._table[key]
+        if isinstance(entry, dict):
+            return BundleMapping(self._data, self._base, entry)
+        offset, length = entry
+        start = self._base + offset
+        return pickle.loads(self._data[start : start + length])
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._table
+
+    def __iter__(self):
+        return iter(self._table)
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    @property
+    def data_bytes(self) -> int:
+        """Size of the blob storage, shared by every view of the same spec"""
+        return len(self._data)
+
+
+def is_spec_bundle(path: Path) -> bool:
+    """Check whether path starts like a bundle written by the compile command"""
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(BUNDLE_MAGIC)) == BUNDLE_MAGIC
+    except OSError:
+        return False
+
+
+def write_spec_bundle(path: Path, index: "SpecIndex", source: str):
+    """Write a prebuilt spec bundle for read_spec_bundle
+
+    The bundle holds a magic line, a header, the pickled SpecIndex with its
+    spec replaced by an offset table, and then the spec itself as separately
+    pickled blobs: one per operation, per component and per other top-level
+    key (see BUNDLE_TABLE_LEVELS). It is written to a temporary file and
+    renamed into place, so a server watching path never reads a partial
+    bundle and servers still mapping the old one keep a consistent copy.
+
+    $refs are not resolved ahead of time: a resolved schema inlines every
+    schema it references, so storing each one as its own blob would repeat
+    shared schemas in every blob that uses them. get_schema resolves them
+    on first use, as for any other source.
+    """
+    blobs: List[bytes] = []
+    size = 0
+
+    def table(node: Any, levels: int) -> Any:
+        nonlocal size
+        if levels > 0 and isinstance(node, Mapping):
+            return {key: table(value, levels - 1) for key, value in node.items()}
+        blob = pickle.dumps(node, protocol=pickle.HIGHEST_PROTOCOL)
+        blobs.append(blob)
+        size += len(blob)
+        return (size - len(blob), len(blob))
+
+    shell = copy.copy(index)
+    shell.spec = {
+        key: table(value, BUNDLE_TABLE_LEVELS.get(key, 0))
+        for key, value in index.spec.items()
+    }
+    shell.resolved_refs = {}
+    shell.ref_edges = {}
+    shell._resident_bytes = None
+
+    header = {
+        "version": SnapshotCache.SNAPSHOT_VERSION,
+        "bundle_version": BUNDLE_VERSION,
+        "source": source,
+    }
+    fd, tmp_path = tempfile.mkstemp(dir=path.resolve().parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(BUNDLE_MAGIC)
+            pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(shell, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.writelines(blobs)
+        os.chmod(tmp_path, 0o644)  # mkstemp creates it private
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_spec_bundle(path: Path) -> "SpecIndex":
+    """Load a bundle written by write_spec_bundle
+
+    The indexes are loaded into memory, while the spec becomes a
+    BundleMapping over the memory-mapped file, decoding operations and
+    schemas only when a tool reads them. Bundles are pickles, so only load
+    bundles from trusted sources.
+
+    Raises:
+        ValueError: if path is not a bundle or was built by an incompatible
+            version of the server
+    """
+    with open(path, "rb") as f:
+        if f.read(len(BUNDLE_MAGIC)) != BUNDLE_MAGIC:
+            raise ValueError(f"{path} is not a spec bundle")
+        header = pickle.load(f)
+        if (
+            header.get("version") != SnapshotCache.SNAPSHOT_VERSION
+            or header.get("bundle_version") != BUNDLE_VERSION
+        ):
+            raise ValueError(
+                f"{path} was built by an incompatible version, rebuild it with "
+                "openapi-spec-mcp compile"
+            )
+        index = _SpecUnpickler(f).load()
+        base = f.tell()
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    index.spec = BundleMapping(data, base, index.spec)
+    return index
+
+
+class UnstreamableSpec(Exception):
+    """The streaming parser cannot split this spec, so it has to be parsed whole"""
+
+
+_MAPPING_END = object()
+
+
+@functools.cache
+def _streaming_yaml_loader() -> type:
+    """The fastest safe YAML loader, able to compose one node at a time"""
+    import yaml
+    from yaml.composer import Composer
+
+    base: Any = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+    class StreamingLoader(base, Composer):
+        def __init__(self, stream):
+            super().__init__(stream)
+            self.anchors = {}
+
+    return StreamingLoader
+
+
+class _YAMLEvents:
+    """Walks a YAML document's top-level mappings key by key"""
+
+    def __init__(self, stream):
+        import yaml
+
+        self.yaml = yaml
+        self.errors = yaml.YAMLError
+        self.loader = _streaming_yaml_loader()(stream)
+        try:
+            self.loader.get_event()  # StreamStartEvent
+            if self.loader.check_event(yaml.StreamEndEvent):
+                raise UnstreamableSpec("the document is empty")
+            self.loader.get_event()  # DocumentStartEvent
+        except yaml.YAMLError as e:
+            raise UnstreamableSpec(str(e)) from e
+
+    def enter_mapping(self) -> bool:
+        """Consume the start of the next value if it is a plain mapping"""
+        event = self.loader.peek_event()
+        if (
+            not isinstance(event, self.yaml.MappingStartEvent)
+            or event.anchor is not None  # aliases need its composed node
+            or event.tag not in (None, "tag:yaml.org,2002:map")
+        ):
+            return False
+        self.loader.get_event()
+        return True
+
+    def next_key(self) -> Any:
+        """Return the next key of the entered mapping, or _MAPPING_END"""
+        if self.loader.check_event(self.yaml.MappingEndEvent):
+            self.loader.get_event()
+            return _MAPPING_END
+        node = self.loader.compose_node(None, None)
+        if node.tag == "tag:yaml.org,2002:merge":
+            raise UnstreamableSpec("it uses a merge key (<<) outside of operations")
+        return self.loader.construct_document(node)
+
+    def value(self) -> Any:
+        return self.loader.construct_document(self.loader.compose_node(None, None))
+
+    def end(self):
+        """Check that the document and the stream end after the top-level mapping"""
+        self.loader.get_event()  # DocumentEndEvent
+        if not self.loader.check_event(self.yaml.StreamEndEvent):
+            raise UnstreamableSpec("the stream holds more than one document")
+
+
+class _JSONEvents:
+    """Walks a JSON document's top-level objects key by key, using ijson"""
+
+    def __init__(self, stream):
+        import ijson
+
+        self.ijson = ijson
+        self.errors = ijson.JSONError
+        self.events = ijson.basic_parse(stream, use_float=True)
+        self.pending = None
+
+    def _next(self) -> Tuple[str, Any]:
+        return next(self.events)
+
+    def _peek(self) -> Tuple[str, Any]:
+        if self.pending is None:
+            self.pending = self._next()
+        return self.pending
+
+    def _take(self) -> Tuple[str, Any]:
+        event = self._peek()
+        self.pending = None
+        return event
+
+    def enter_mapping(self) -> bool:
+        if self._peek()[0] != "start_map":
+            return False
+        self._take()
+        return True
+
+    def next_key(self) -> Any:
+        event, value = self._take()
+        return value if event == "map_key" else _MAPPING_END
+
+    def value(self) -> Any:
+        builder = self.ijson.ObjectBuilder()
+        depth = 0
+        while True:
+            event, value = self._take()
+            builder.event(event, value)
+            if event in ("start_map", "start_array"):
+                depth += 1
+            elif event in ("end_map", "end_array"):
+                depth -= 1
+            if depth == 0:
+                return builder.value
+
+    def end(self):
+        """Check that nothing but whitespace follows the top-level object"""
+        try:
+            self._peek()
+        except StopIteration:
+            return
+        raise UnstreamableSpec("content follows the top-level object")
+
+
+def streaming_available(fmt: str) -> bool:
+    """Check whether stream_spec can parse fmt ("json" needs the ijson package)"""
+    if fmt == "json":
+        try:
+            import ijson  # noqa: F401
+        except ImportError:
+            return False
+    return True
+
+
+def stream_spec(stream, fmt: str) -> BundleMapping:
+    """Parse a spec from a binary stream one operation or component at a time
+
+    The document is walked as a stream of parser events. Only the mapping
+    levels listed in BUNDLE_TABLE_LEVELS become offset tables; every value
+    below them (an operation, a schema, ...) is built, pickled into a shared
+    buffer and dropped, so peak memory is the compact buffer plus one such
+    subtree rather than the whole object graph. Values are decoded again
+    when read, as with bundles.
+
+    Raises:
+        UnstreamableSpec: if the document cannot be split this way (not a
+            mapping, merge keys at the split levels, JSON numbers ijson
+            rejects) or is not the only thing in the stream (several YAML
+            documents, trailing content); parse it whole instead, which
+            also reports any syntax error
+    """
+    events = _YAMLEvents(stream) if fmt == "yaml" else _JSONEvents(stream)
+    blobs = bytearray()
+
+    def table(levels: int) -> Any:
+        if levels > 0 and events.enter_mapping():
+            entries = {}
+            while (key := events.next_key()) is not _MAPPING_END:
+                entries[key] = table(levels - 1)
+            return entries
+        blob = pickle.dumps(events.value(), protocol=pickle.HIGHEST_PROTOCOL)
+        blobs.extend(blob)
+        return (len(blobs) - len(blob), len(blob))
+
+    try:
+        if not events.enter_mapping():
+            raise UnstreamableSpec("the document is not a mapping")
+        tables = {}
+        while (key := events.next_key()) is not _MAPPING_END:
+            tables[key] = table(BUNDLE_TABLE_LEVELS.get(key, 0))
+        events.end()
+    except events.errors as e:
+        # Syntax errors, or e.g. JSON integers wider than 64 bits; the
+        # whole-document parser handles those or reports the error properly
+        raise UnstreamableSpec(str(e)) from e
+    return BundleMapping(blobs, 0, tables)
+
+
+class _HashingReader:
+    """Binary file wrapper that hashes everything read through it"""
+
+    def __init__(self, f, digest):
+        self._f = f
+        self._digest = digest
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._f.read(size)
+        self._digest.update(data)
+        return data
+
+
+class FetchError(Exception):
+    """A remote spec could not be fetched and no cached copy could stand in"""
+
+
+class RemoteSpecFetcher:
+    """Fetches a remote spec, revalidating it against a local disk cache
+
+    The last good response body is kept in the cache directory together with
+    its ETag and Last-Modified validators (pickled header, then the raw body,
+    like SnapshotCache). Requests are conditional whenever a cached copy
+    exists, accept gzip/deflate encodings, time out, and are retried with
+    exponential backoff on connection errors, 429 and 5xx responses. If every
+    attempt fails on the first fetch, the cached copy is served instead.
+
+    Once the body has been parsed, release() drops it from memory; only its
+    hash is kept, to recognize it when it is fetched again.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        cache_dir: Path | None = None,
+        timeout: float = DEFAULT_FETCH_TIMEOUT,
+        retries: int = DEFAULT_FETCH_RETRIES,
+    ):
+        self.url = url
+        self.cache_dir = cache_dir
+        self.timeout = timeout
+        self.retries = retries
+        self.etag: str | None = None
+        self.last_modified: str | None = None
+        self.content: bytes | None = None
+        # SHA-256 of the body, kept after release() drops it
+        self.content_hash: str | None = None
+        # Whether fetch() has already returned the body to the caller
+        self.delivered = False
+        self.logger = logging.getLogger(__name__)
+        self._load_cached()
+
+    def _entry_path(self) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        key = hashlib.sha256(self.url.encode("utf-8")).hexdigest()
+        return self.cache_dir / f"{key}.remote"
+
+    def _read_cached(self) -> Tuple[Dict[str, Any], bytes] | None:
+        """Read the cached header and body, or None if there is no usable copy"""
+        entry = self._entry_path()
+        if entry is None:
+            return None
+        try:
+            with open(entry, "rb") as f:
+                header = pickle.load(f)
+                if header.get("url") != self.url:
+                    return None
+                return header, f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable cached spec {entry}: {e}")
+            return None
+
+    def _load_cached(self):
+        cached = self._read_cached()
+        if cached is None:
+            return
+        header, self.content = cached
+        self.content_hash = SnapshotCache.content_hash(self.content)
+        self.etag = header.get("etag")
+        self.last_modified = header.get("last_modified")
+
+    def _store_cached(self, content: bytes):
+        entry = self._entry_path()
+        if entry is None:
+            return
+        header = {
+            "url": self.url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+        }
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=entry.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    f.write(content)
+                os.replace(tmp_path, entry)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            self.logger.warning(f"Failed to cache remote spec {entry}: {e}")
+
+    def _request_headers(self, conditional: bool) -> Dict[str, str]:
+        headers = {"Accept-Encoding": "gzip, deflate"}
+        if conditional and self.content_hash is not None:
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            if self.last_modified:
+                headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    async def _request(self, client, conditional: bool = True) -> Tuple[int, Any]:
+        """GET the spec, retrying transient failures; returns (status, response)"""
+        import httpx
+
+        headers = self._request_headers(conditional)
+        for attempt in range(self.retries + 1):
+            retryable = attempt < self.retries
+            try:
+                response = await client.get(self.url, headers=headers)
+                if response.status_code in (429, 500, 502, 503, 504) and retryable:
+                    raise FetchError(f"HTTP {response.status_code}")
+                if response.status_code != 304:
+                    response.raise_for_status()
+                return response.status_code, response
+            except (httpx.TransportError, FetchError) as e:
+                if not retryable:
+                    raise
+                delay = min(FETCH_BACKOFF * 2**attempt, FETCH_MAX_BACKOFF)
+                delay *= random.uniform(0.5, 1.0)
+                self.logger.warning(
+                    f"Fetching {self.url} failed ({e!r}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+        raise AssertionError("the last attempt returns or raises")
+
+    async def fetch(self) -> bytes | None:
+        """Fetch the spec, returning its body or None if unchanged
+
+        None means the body is the same one a previous call already returned.
+        The first call returns the cached copy when the server answers 304 or
+        cannot be reached.
+
+        Raises:
+            FetchError: if the spec could not be fetched and there is no
+                cached copy to fall back to
+        """
+        import httpx
+
+        try:
+            async with httpx.AsyncClient(
+                timeout=self.timeout, follow_redirects=True
+            ) as client:
+                status, response = await self._request(client)
+        except (httpx.HTTPError, FetchError) as e:
+            if self.content is not None and not self.delivered:
+                self.logger.warning(
+                    f"Fetching {self.url} failed ({e!r}), using the cached copy"
+                )
+                self.delivered = True
+                return self.content
+            raise FetchError(f"Failed to fetch {self.url}: {e!r}") from e
+
+        if status == 304:
+            self.logger.debug(f"{self.url} not modified")
+            if self.delivered:
+                return None
+            self.delivered = True
+            return self.content
+
+        content_hash = SnapshotCache.content_hash(response.content)
+        unchanged = self.delivered and content_hash == self.content_hash
+        self._accept(response, content_hash)
+        self.content = response.content
+        self.delivered = True
+        return None if unchanged else self.content
+
+    async def refetch(self) -> bytes:
+        """Return the body again after release(), for reloading an evicted spec
+
+        The cached copy is used while it is still the body last returned;
+        otherwise the spec is fetched unconditionally, and may have changed.
+
+        Raises:
+            FetchError: if the spec could not be fetched
+        """
+        import httpx
+
+        cached = self._read_cached()
+        if cached is not None:
+            content = cached[1]
+            if SnapshotCache.content_hash(content) == self.content_hash:
+                return content
+        try:
+            async with httpx.AsyncClient(
+                timeout=self.timeout, follow_redirects=True
+            ) as client:
+                _, response = await self._request(client, conditional=False)
+        except (httpx.HTTPError, FetchError) as e:
+            raise FetchError(f"Failed to fetch {self.url}: {e!r}") from e
+        self._accept(response, SnapshotCache.content_hash(response.content))
+        return response.content
+
+    def _accept(self, response, content_hash: str):
+        """Take the validators of a 200 response and cache its body"""
+        self.etag = response.headers.get("etag")
+        self.last_modified = response.headers.get("last-modified")
+        self.content_hash = content_hash
+        self.logger.info(
+            f"Fetched {self.url} ({len(response.content)} bytes, "
+            f"{response.headers.get('content-encoding', 'identity')} encoded)"
+        )
+        self._store_cached(response.content)
+
+    def release(self):
+        """Drop the body from memory once it has been parsed"""
+        self.content = None
+
+
+class SpecSource:
+    """One hosted spec: where it is loaded from and its published index
+
+    The index and its generation are replaced as one tuple, so readers never
+    see a new index paired with an old generation. The generation is
+    incremented on every load, invalidating cached responses, but not when
+    an evicted spec is restored from unchanged content.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        docs_source: str,
+        cache_dir: Path | None = None,
+        fetch_timeout: float = DEFAULT_FETCH_TIMEOUT,
+        fetch_retries: int = DEFAULT_FETCH_RETRIES,
+        stream_min_bytes: int = DEFAULT_STREAM_MIN_BYTES,
+    ):
+        self.name = name
+        self.docs_source = docs_source
+        self.docs_path = Path(docs_source) if not is_url(docs_source) else None
+        self.snapshot: Tuple[SpecIndex | None, int] = (None, 0)
+        # File state or body hash the published index was loaded from
+        self.fingerprint: Any = None
+        # Set once the first load attempt has finished, successful or not
+        self.ready = asyncio.Event()
+        # What the spec is doing while it loads, for progress notifications
+        self.load_phase = "queued"
+        self.registry: "SpecRegistry | None" = None
+        self.evicted = False
+        self.evictions = 0
+        self.restores = 0
+        self._restore_lock = asyncio.Lock()
+        self.cache_dir = cache_dir
+        self.stream_min_bytes = stream_min_bytes
+        self.snapshots = SnapshotCache(cache_dir) if cache_dir else None
+        self.fetcher = (
+            RemoteSpecFetcher(docs_source, cache_dir, fetch_timeout, fetch_retries)
+            if self.docs_path is None
+            else None
+        )
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def index(self) -> SpecIndex | None:
+        return self.snapshot[0]
+
+    @property
+    def resident_bytes(self) -> int:
+        index = self.index
+        return index.resident_bytes if index and not self.evicted else 0
+
+    def load_spec(self, content: bytes | None = None) -> bool:
+        """Load OpenAPI spec from the specified file or URL and publish it
+
+        The new spec and its indexes are built without touching the published
+        snapshot, then swapped in with a single assignment. If loading fails
+        the previous snapshot stays in place.
+
+        Args:
+            content: Already fetched body of a remote spec; fetched here when
+                omitted, which must not happen on a running event loop
+
+        Returns:
+            True if a new snapshot was published
+        """
+        index, fingerprint = self._build_index(content)
+        if index is None:
+            self._keep_published()
+            return False
+        self.publish(index, fingerprint)
+        return True
+
+    def _build_index(
+        self, content: bytes | None = None
+    ) -> Tuple[SpecIndex | None, Any]:
+        """Load the spec and build its index, logging and returning None on failure
+
+        Returns:
+            The index and the fingerprint of what it was loaded from
+        """
+        self.logger.info(f"Loading OpenAPI spec from {self.docs_source}")
+
+        try:
+            if self.fetcher is not None:
+                if content is None:
+                    self.load_phase = "fetching"
+                    content = asyncio.run(self.fetcher.fetch())
+                fingerprint = SnapshotCache.content_hash(content) if content else None
+                self.load_phase = "parsing"
+                spec = self._parse_remote_spec(content) if content else None
+                self.fetcher.release()
+                self.load_phase = "indexing"
+                with startup_profile.phase("index"):
+                    index = SpecIndex(spec) if spec else None
+            else:
+                # Taken first, so a change while loading still reads as a change
+                fingerprint = self._spec_file_state()
+                index = self._load_spec_from_file()
+        except Exception as e:
+            self.logger.error(
+                f"Failed to load OpenAPI spec from {self.docs_source}: {e}"
+            )
+            return None, None
+        if index is not None and self.registry and self.registry.max_bytes:
+            index.resident_bytes  # measure here rather than in publish()
+        return index, fingerprint
+
+    def publish(
+        self, index: SpecIndex, fingerprint: Any = None, new_generation: bool = True
+    ):
+        """Make index the spec's current snapshot
+
+        Args:
+            index: The loaded index
+            fingerprint: File state or body hash index was loaded from
+            new_generation: False when index reloads an evicted spec from
+                unchanged content, whose cached responses are still valid
+        """
+        generation = self.snapshot[1] + 1 if new_generation else self.snapshot[1]
+        self.snapshot = (index, generation)
+        self.fingerprint = fingerprint
+        self.evicted = False
+        self.load_phase = "loaded"
+        self.logger.info(
+            f"Successfully loaded OpenAPI spec from {self.docs_source} "
+            f"({len(index.endpoints)} endpoints indexed)"
+        )
+        if self.registry:
+            self.registry.published(self)
+
+    def _keep_published(self):
+        """Reset load_phase after a reload that left the published snapshot in place"""
+        if self.index is not None:
+            self.load_phase = "loaded"
+
+    def evict(self) -> int:
+        """Drop the spec body and resolved refs to free memory until restore()
+
+        The search indexes and endpoint tables stay published, so searches
+        and endpoint listings keep working without a restore, and the
+        generation is kept, so cached responses keep answering for the spec.
+
+        Returns:
+            The number of resident bytes released
+        """
+        index = self.index
+        if index is None or self.evicted:
+            return 0
+        self.snapshot = (index.without_spec(), self.snapshot[1])
+        self.evicted = True
+        self.evictions += 1
+        self.logger.info(
+            f"Evicted {self.name} ({index.resident_bytes / 1e6:.1f} MB) from memory"
+        )
+        return index.resident_bytes
+
+    async def restore(self):
+        """Reload an evicted spec, from its compiled snapshot when there is one
+
+        The generation is only kept if the spec is reloaded from the same
+        file state or body it was evicted with.
+        """
+        async with self._restore_lock:
+            if not self.evicted:
+                return
+            self.restores += 1
+            content = None
+            if self.fetcher is not None:
+                try:
+                    content = await self.fetcher.refetch()
+                except FetchError as e:
+                    self.logger.error(str(e))
+                    self._keep_published()
+                    return
+            index, fingerprint = await asyncio.to_thread(self._build_index, content)
+            if index is None:
+                self._keep_published()
+                return
+            changed = fingerprint is None or fingerprint != self.fingerprint
+            if changed:
+                self.logger.info(f"{self.name} changed while evicted")
+            self.publish(index, fingerprint, new_generation=changed)
+
+    async def load_compiled_spec(self, pool: ProcessPoolExecutor) -> bool:
+        """Parse and index the local spec in a worker process and publish it
+
+        Returns:
+            True if a new snapshot was published
+        """
+        self.logger.info(
+            f"Loading OpenAPI spec from {self.docs_source} in a worker process"
+        )
+        self.load_phase = "parsing and indexing in a worker process"
+        fingerprint = self._spec_file_state()
+        loop = asyncio.get_running_loop()
+        try:
+            with startup_profile.phase("worker processes"):
+                data = await loop.run_in_executor(
+                    pool,
+                    compile_spec,
+                    str(self.docs_path),
+                    self.cache_dir,
+                    self.stream_min_bytes,
+                )
+            if data is None:
+                return False
+            index = await asyncio.to_thread(self._unpickle_index, data)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to load OpenAPI spec from {self.docs_source}: {e}"
+            )
+            return False
+        self.publish(index, fingerprint)
+        return True
+
+    def _unpickle_index(self, data: bytes) -> SpecIndex:
+        """Decode an index compiled by a worker process, measuring it if needed"""
+        index = pickle.loads(data)
+        if self.registry and self.registry.max_bytes:
+            index.resident_bytes  # measure here rather than in publish()
+        return index
+
+    async def load_remote_spec(self) -> bool:
+        """Fetch the remote spec without blocking the event loop and publish it
+
+        Parsing and indexing run on a separate thread.
+
+        Returns:
+            True if a new snapshot was published
+        """
+        if self.fetcher is None:
+            self.logger.error(f"Cannot fetch {self.docs_source}: not a URL")
+            return False
+        self.logger.info(f"Fetching OpenAPI spec from {self.docs_source}")
+        self.load_phase = "fetching"
+        try:
+            with startup_profile.phase("fetch"):
+                content = await self.fetcher.fetch()
+        except FetchError as e:
+            self.logger.error(str(e))
+            self._keep_published()
+            return False
+        if content is None:
+            self._keep_published()
+            return False
+        return await asyncio.to_thread(self.load_spec, content)
+
+    def _parse_remote_spec(self, content: bytes) -> Any:
+        """Parse the body of a remote spec"""
+        # Try to determine format from URL or content
+        if self.docs_source.lower().endswith((".yaml", ".yml")):
+            return parse_document(content, "yaml")
+        elif self.docs_source.lower().endswith(".json"):
+            return parse_document(content, "json")
+        else:
+            # Try JSON first, then YAML
+            try:
+                return parse_document(content, "json")
+            except json.JSONDecodeError:
+                return parse_document(content, "yaml")
+
+    def _load_spec_from_file(self) -> SpecIndex | None:
+        """Load OpenAPI spec from a local file and build its index"""
+        if self.docs_path is None:
+            self.logger.error("Cannot load from file: path is None")
+            return None
+
+        if not self.docs_path.exists():
+            self.logger.error(f"OpenAPI spec file not found: {self.docs_path}")
+            return None
+
+        if self.docs_path.suffix.lower() == BUNDLE_SUFFIX or is_spec_bundle(
+            self.docs_path
+        ):
+            self.load_phase = "reading bundle"
+            start = time.perf_counter()
+            with startup_profile.phase("bundle"):
+                index = read_spec_bundle(self.docs_path)
+            self.logger.info(
+                f"Loaded bundle {self.docs_path} in {time.perf_counter() - start:.3f}s"
+            )
+            return index
+
+        if self.snapshots:
+            self.load_phase = "reading snapshot"
+            start = time.perf_counter()
+            with startup_profile.phase("snapshot"):
+                index = self.snapshots.load(self.docs_path)
+            if index is not None:
+                self.logger.info(
+                    f"Loaded compiled snapshot of {self.docs_path} in "
+                    f"{time.perf_counter() - start:.3f}s"
+                )
+                return index
+
+        self.load_phase = "parsing"
+        if self.docs_path.suffix.lower() in [".yaml", ".yml"]:
+            fmt = "yaml"
+        elif self.docs_path.suffix.lower() == ".json":
+            fmt = "json"
+        else:
+            raise ValueError(f"Unsupported file format: {self.docs_path.suffix}")
+
+        stat = self.docs_path.stat()
+        spec, content_hash = None, ""
+        if stat.st_size >= self.stream_min_bytes and streaming_available(fmt):
+            spec, content_hash = self._stream_spec_file(self.docs_path, fmt)
+        if spec is None:
+            content = self.docs_path.read_bytes()
+            content_hash = SnapshotCache.content_hash(content)
+            spec = parse_document(content, fmt)
+            del content
+
+        if not spec:
+            return None
+        self.load_phase = "indexing"
+        with startup_profile.phase("index"):
+            index = SpecIndex(spec)
+        if self.snapshots:
+            self.snapshots.store(self.docs_path, stat, content_hash, index)
+        return index
+
+    def _stream_spec_file(
+        self, path: Path, fmt: str
+    ) -> Tuple[BundleMapping | None, str]:
+        """Parse the local spec at path with stream_spec, hashing it on the way
+
+        Returns:
+            The spec, or None if it has to be parsed whole, and the SHA-256
+            of the file content
+        """
+        self.load_phase = "parsing (streaming)"
+        digest = hashlib.sha256()
+        start = time.perf_counter()
+        with open(path, "rb") as f:
+            reader = _HashingReader(f, digest)
+            try:
+                with startup_profile.phase("parse"):
+                    spec = stream_spec(reader, fmt)
+            except UnstreamableSpec as e:
+                self.logger.info(f"Parsing {path} whole: {e}")
+                return None, ""
+            while reader.read(1 << 20):  # hash anything after the document
+                pass
+        self.logger.info(
+            f"Streamed {fmt.upper()} spec {path} into "
+            f"{spec.data_bytes / 1e6:.1f} MB of blobs in {time.perf_counter() - start:.3f}s"
+        )
+        return spec, digest.hexdigest()
+
+    def _spec_file_state(self) -> Tuple[int, int, int] | None:
+        if self.docs_path is None:
+            return None
+        try:
+            stat = self.docs_path.stat()
+        except OSError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    async def _spec_changes(self):
+        """Yield whenever the local spec file may have changed
+
+        Uses inotify (through watchfiles) when available, otherwise polls the
+        file's inode, size and mtime every WATCH_POLL_INTERVAL seconds. The
+        parent directory is watched so specs regenerated by writing a new file
+        and renaming it over the old one are picked up too.
+        """
+        if self.docs_path is None:
+            return
+        try:
+            import watchfiles
+        except ImportError:  # optional inotify-based watcher, polled otherwise
+            watchfiles = None
+
+        if watchfiles is not None:
+            target = str(self.docs_path.resolve())
+            async for _ in watchfiles.awatch(
+                self.docs_path.resolve().parent,
+                watch_filter=lambda change, path: path == target,
+                debounce=WATCH_DEBOUNCE_MS,
+                recursive=False,
+            ):
+                yield
+            return
+
+        state = self._spec_file_state()
+        while True:
+            await asyncio.sleep(WATCH_POLL_INTERVAL)
+            current = self._spec_file_state()
+            if current != state:
+                state = current
+                yield
+
+    async def watch_spec(self):
+        """Reload the spec whenever its file changes
+
+        Rebuilding runs on its own thread so neither the event loop nor the
+        tool workers wait on it; tool calls already running keep reading the
+        snapshot they started with.
+        """
+        self.logger.info(f"Watching {self.docs_path} for changes")
+        async for _ in self._spec_changes():
+            if self._spec_file_state() is None:
+                continue  # removed, presumably about to be replaced
+            self.logger.info(f"{self.docs_path} changed, reloading")
+            start = time.perf_counter()
+            if await asyncio.to_thread(self.load_spec):
+                self.logger.info(
+                    f"Reloaded {self.docs_path} in {time.perf_counter() - start:.3f}s "
+                    f"(generation {self.snapshot[1]})"
+                )
+
+    async def refresh_remote_spec(self, interval: float):
+        """Revalidate the remote spec every interval seconds
+
+        Each round is one conditional request; only a changed spec is parsed
+        and indexed (off the event loop) and swapped in. Failed rounds keep
+        serving the current spec.
+        """
+        self.logger.info(f"Refreshing {self.docs_source} every {interval:g}s")
+        while True:
+            await asyncio.sleep(interval)
+            start = time.perf_counter()
+            if await self.load_remote_spec():
+                self.logger.info(
+                    f"Refreshed {self.docs_source} in {time.perf_counter() - start:.3f}s "
+                    f"(generation {self.snapshot[1]})"
+                )
+
+
+class SpecRegistry:
+    """Hosted specs, keeping their loaded indexes within a memory budget
+
+    Once the resident indexes exceed max_bytes (0 for unlimited), the least
+    recently used specs are evicted; an evicted spec is restored from its
+    compiled snapshot (or its source) by the next tool call that needs it.
+    The spec most recently published or used is never evicted, so a spec
+    larger than the whole budget is still served.
+    """
+
+    def __init__(self, sources: Dict[str, "SpecSource"], max_bytes: int = 0):
+        self.sources = sources
+        self.max_bytes = max_bytes
+        # Names of resident specs, least recently used first
+        self._resident: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+        for source in sources.values():
+            source.registry = self
+
+    def touch(self, name: str):
+        """Mark a spec as just used"""
+        with self._lock:
+            if name in self._resident:
+                self._resident.move_to_end(name)
+
+    def published(self, source: "SpecSource"):
+        """Account for a newly loaded index, evicting others past the budget"""
+        with self._lock:
+            self._resident[source.name] = None
+            self._resident.move_to_end(source.name)
+            if not self.max_bytes:
+                return
+            total = self.resident_bytes()
+            while total > self.max_bytes and len(self._resident) > 1:
+                name, _ = self._resident.popitem(last=False)
+                total -= self.sources[name].evict()
+
+    def resident_bytes(self) -> int:
+        return sum(self.sources[name].resident_bytes for name in self._resident)
+
+
+def compile_spec(
+    docs_path: str, cache_dir: Path | None, stream_min_bytes: int
+) -> bytes | None:
+    """Parse and index a local spec file, for running in a worker process
+
+    Returns:
+        The pickled SpecIndex (the payload of an on-disk snapshot), which the
+        parent process loads much faster than it could parse the spec, or
+        None if the spec could not be loaded
+    """
+    source = SpecSource(
+        Path(docs_path).stem, docs_path, cache_dir, stream_min_bytes=stream_min_bytes
+    )
+    try:
+        index = source._load_spec_from_file()
+    except Exception as e:
+        source.logger.error(f"Failed to load OpenAPI spec from {docs_path}: {e}")
+        return None
+    if index is None:
+        return None
+    return pickle.dumps(index, protocol=pickle.HIGHEST_PROTOCOL)
 
 
 class OpenAPIServer:
-    def __init__(self, docs_path: str):
-        self.docs_source = docs_path
-        self.docs_path = Path(docs_path) if not self._is_url(docs_path) else None
-        self.server = Server("openapi-docs")
-        self.spec = None
+    def __init__(
+        self,
+        docs_path: str | List[str] | Dict[str, str],
+        cache_dir: Path | None = None,
+        max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES,
+        workers: int = DEFAULT_WORKERS,
+        tool_concurrency: Dict[str, int] | None = None,
+        response_cache_bytes: int = DEFAULT_RESPONSE_CACHE_BYTES,
+        output_format: str = "json",
+        load_processes: int = DEFAULT_LOAD_PROCESSES,
+        spec_memory_bytes: int = DEFAULT_SPEC_MEMORY_BYTES,
+        ready_timeout: float = DEFAULT_READY_TIMEOUT,
+        watch: bool = True,
+        fetch_timeout: float = DEFAULT_FETCH_TIMEOUT,
+        fetch_retries: int = DEFAULT_FETCH_RETRIES,
+        refresh_interval: float = 0,
+        stream_min_bytes: int = DEFAULT_STREAM_MIN_BYTES,
+    ):
+        if isinstance(docs_path, str):
+            docs_path = [docs_path]
+        if isinstance(docs_path, dict):
+            locations = dict(docs_path)
+        else:
+            locations = expand_spec_locations(docs_path)
+        self.registry = SpecRegistry(
+            {
+                name: SpecSource(
+                    name,
+                    location,
+                    cache_dir,
+                    fetch_timeout,
+                    fetch_retries,
+                    stream_min_bytes,
+                )
+                for name, location in locations.items()
+            },
+            spec_memory_bytes,
+        )
+        self.specs: Dict[str, SpecSource] = self.registry.sources
+        with startup_profile.phase("imports"):
+            from mcp.server import Server
+
+        self.server = Server("openapi-docs", version="0.1.0")
+        self.load_processes = load_processes
+        self.ready_timeout = ready_timeout
+        self.watch = watch
+        self.refresh_interval = refresh_interval
+        self.max_response_bytes = max_response_bytes
+        self.output_format = output_format
+        self.executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="openapi-tool")
+            if workers > 0
+            else None
+        )
+        self.tool_concurrency = tool_concurrency or {}
+        self._tool_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.response_cache = (
+            ResponseCache(response_cache_bytes) if response_cache_bytes > 0 else None
+        )
         self.logger = logging.getLogger(__name__)
-        self.logger.info(f"Initializing OpenAPI server with docs source: {docs_path}")
-        self.load_spec()
+        self.logger.info(
+            f"Initializing OpenAPI server with {len(self.specs)} spec(s): "
+            f"{', '.join(f'{n} ({s.docs_source})' for n, s in self.specs.items())}"
+        )
+        # Specs are loaded by load_specs(), which run() starts in the background
         self.setup_handlers()
 
-    def _is_url(self, path: str) -> bool:
-        """Check if the path is a URL"""
-        parsed = urlparse(path)
-        return parsed.scheme in ("http", "https")
+    async def load_specs(self):
+        """Load every spec concurrently, publishing each as soon as it is ready
+
+        Local specs without a fresh compiled snapshot are parsed and indexed
+        on a pool of load_processes worker processes, so startup scales with
+        cores instead of being serialized by the GIL; everything else (fresh
+        snapshots, bundles, a lone spec, remote fetches) loads on threads and
+        the event loop. Each spec's ready event is set when its load finishes.
+        """
+        pending = [
+            source for source in self.specs.values() if not source.ready.is_set()
+        ]
+        # Checking snapshots may hash the spec files, so not on the event loop
+        compile_in_pool = set(await asyncio.to_thread(self._specs_to_compile, pending))
+        pool = None
+        processes = min(self.load_processes, len(compile_in_pool))
+        if processes > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            compile_in_pool = set()
+
+        async def load(source: SpecSource):
+            try:
+                if source.fetcher is not None:
+                    await source.load_remote_spec()
+                elif pool and source in compile_in_pool:
+                    await source.load_compiled_spec(pool)
+                else:
+                    await asyncio.to_thread(source.load_spec)
+            finally:
+                if source.index is None:
+                    source.load_phase = "failed"
+                source.ready.set()
+
+        start = time.perf_counter()
+        try:
+            await asyncio.gather(*(load(source) for source in pending))
+        finally:
+            if pool:
+                pool.shutdown(wait=False, cancel_futures=True)
+        startup_profile.mark("specs loaded")
+        loaded = sum(1 for source in pending if source.index is not None)
+        self.logger.info(
+            f"Loaded {loaded} of {len(pending)} spec(s) in "
+            f"{time.perf_counter() - start:.3f}s"
+        )
+
+    @staticmethod
+    def _specs_to_compile(sources: List[SpecSource]) -> List[SpecSource]:
+        """Return the local specs that have neither a bundle nor a fresh snapshot"""
+        return [
+            source
+            for source in sources
+            if source.docs_path is not None
+            and not is_spec_bundle(source.docs_path)
+            and not (source.snapshots and source.snapshots.is_fresh(source.docs_path))
+        ]
+
+    def _current_snapshot(self) -> Tuple[SpecIndex | None, int]:
+        pinned = _pinned_snapshot.get()
+        if pinned:
+            return pinned
+        if len(self.specs) == 1:
+            return next(iter(self.specs.values())).snapshot
+        return (None, 0)
+
+    @property
+    def index(self) -> SpecIndex | None:
+        """Spec index the running tool call is pinned to
+
+        Outside tool calls this is the only spec's latest index, or None when
+        several specs are hosted.
+        """
+        return self._current_snapshot()[0]
+
+    @property
+    def spec(self) -> Mapping | None:
+        index = self.index
+        return index.spec if index else None
+
+    @property
+    def generation(self) -> int:
+        return self._current_snapshot()[1]
+
+    def setup_handlers(self):
+        import mcp.types as types
+
+        @self.server.list_tools()
+        async def handle_list_tools() -> list[types.Tool]:
+            spec_property = {
+                "spec": {
+                    "type": "string",
+                    "enum": list(self.specs),
+                    "description": "Name of the spec to query (see list_specs); "
+                    "search_endpoints, search_schemas and match_endpoint cover "
+                    "every spec when omitted",
+                }
+            }
+            return [
+                types.Tool(
+                    name="search_endpoints",
+                    description="Search API endpoints by keyword, best matches first",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "query": {"type": "string", "description": "Search term"},
+                            **PAGING_PROPERTIES,
+                            **spec_property,
+                            **FORMAT_PROPERTY,
+                        },
+                        "required": ["query"],
+                    },
+                ),
+                types.Tool(
+                    name="get_endpoint",
+                    description="Get details for a specific endpoint",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "path": {"type": "string"},
+                            "method": {"type": "string"},
+                            **MAX_BYTES_PROPERTY,
+                            **spec_property,
+                            **FORMAT_PROPERTY,
+                        },
+                        "required": ["path", "method"],
+                    },
+                ),
+                types.Tool(
+                    name="match_endpoint",
+                    description="Find the endpoint serving a concrete URL or path "
+                    "(e.g. /v2/orgs/42/users) and extract its path parameters",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "url": {
+                                "type": "string",
+                                "description": "Concrete path or full URL",
+                            },
+                            "method": {"type": "string"},
+                            **MAX_BYTES_PROPERTY,
+                            **spec_property,
+                            **FORMAT_PROPERTY,
+                        },
+                        "required": ["url", "method"],
+                    },
+                ),
+                types.Tool(
+                    name="list_all_endpoints",
+                    description="List available API endpoints one page at a time, "
+                    "sorted by path; pass next_cursor back to get the next page",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "limit": {
+                                "type": "integer",
+                                "description": "Maximum number of endpoints per page "
+                                f"(default {DEFAULT_LIST_LIMIT})",
+                                "minimum": 0,
+                            },
+                            "cursor": {
+                                "type": "string",
+                                "description": "next_cursor from the previous page, "
+                                "with the same tag and method",
+                            },
+                            "tag": {
+                                "type": "string",
+                                "description": "Only list endpoints with this tag",
+                            },
+                            "method": {
+                                "type": "string",
+                                "description": "Only list endpoints with this HTTP method",
+                            },
+                            **spec_property,
+                            **FORMAT_PROPERTY,
+                        },
+                    },
+                ),
+                types.Tool(
+                    name="search_schemas",
+                    description="Search schema definitions by name, best matches first",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "query": {
+                                "type": "string",
+                                "description": "Search term to match against schema names",
+                            },
+                            **PAGING_PROPERTIES,
+                            **spec_property,
+                            **FORMAT_PROPERTY,
+                        },
+                        "required": ["query"],
+                    },
+                ),
+                types.Tool(
+                    name="get_schema",
+                    description="Get a specific schema definition with all $ref references resolved",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "schema_name": {
+                                "type": "string",
+                                "description": "Name of the schema to retrieve",
+                            },
+                            **MAX_BYTES_PROPERTY,
+                            **spec_property,
+                            **FORMAT_PROPERTY,
+                        },
+                        "required": ["schema_name"],
+                    },
+                ),
+                types.Tool(
+                    name="expand",
+                    description='Expand a {"$handle": ...} placeholder left in a '
+                    "get_schema or get_endpoint response that exceeded the size budget",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {
+                            "handle": {
+                                "type": "string",
+                                "description": "The $handle value of the placeholder",
+                            },
+                            **MAX_BYTES_PROPERTY,
+                            **spec_property,
+                            **FORMAT_PROPERTY,
+                        },
+                        "required": ["handle"],
+                    },
+                ),
+                types.Tool(
+                    name="list_specs",
+                    description="List the hosted API specs with their sources and "
+                    "endpoint and schema counts",
+                    inputSchema={
+                        "type": "object",
+                        "properties": {**FORMAT_PROPERTY},
+                    },
+                ),
+            ]
+
+        @self.server.call_tool()
+        async def handle_call_tool(
+            name: str, arguments: dict | None
+        ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+            self.logger.info(f"Tool called: {name} with arguments: {arguments}")
+            text = await self._run_tool(name, arguments, self._progress_reporter())
+            return [types.TextContent(type="text", text=text)]
+
+    def _progress_reporter(self):
+        """Return a coroutine function sending progress for the current
+        request, or None if the client did not ask for progress"""
+        context = self.server.request_context
+        token = context.meta.progressToken if context.meta else None
+        if token is None:
+            return None
+
+        async def report(progress: float, total: float, message: str):
+            await context.session.send_progress_notification(
+                token,
+                progress,
+                total,
+                message,
+                related_request_id=str(context.request_id),
+            )
+
+        return report
+
+    async def _run_tool(self, name: str, arguments: dict | None, progress=None) -> str:
+        """Run a tool call, answering from the response cache when possible
+
+        The call waits until the specs it reads have loaded, then is pinned
+        to their snapshots published at that point.
+        """
+        self._check_spec_argument(name, arguments)
+        await self._wait_for_specs(name, arguments, progress)
+        snapshots = self._tool_snapshots(name, arguments)
+        for spec in snapshots:
+            self.registry.touch(spec)
+        if name == "list_specs":
+            return await self._execute_tool(name, arguments, snapshots)
+        if self.response_cache is None:
+            snapshots = await self._restore_evicted(name, arguments, snapshots)
+            return await self._execute_tool(name, arguments, snapshots)
+
+        # Evicted specs keep their generation, so they can still be answered
+        # from the cache without being restored
+        generations = tuple(
+            (spec, generation) for spec, (_, generation) in snapshots.items()
+        )
+        key = ResponseCache.key(name, arguments, generations)
+        text = self.response_cache.get(key)
+        if text is not None:
+            self.logger.debug(f"Response cache hit for {name}")
+            return text
+        snapshots = await self._restore_evicted(name, arguments, snapshots)
+        text = await self._execute_tool(name, arguments, snapshots)
+        self.response_cache.put(key, text)
+        return text
+
+    async def _wait_for_specs(self, name: str, arguments: dict | None, progress=None):
+        """Wait until the specs a tool call reads have loaded
+
+        A call covering several specs only waits for the first of them, and
+        is answered from the specs loaded by then. Every PROGRESS_INTERVAL
+        seconds of waiting, progress (if given) is called with the number of
+        specs loaded so far, the number waited for and a message saying what
+        is still loading.
+
+        Raises:
+            TimeoutError: if they are not loaded within ready_timeout seconds
+        """
+        spec = (arguments or {}).get("spec")
+        if spec in self.specs:
+            sources = [self.specs[spec]]
+        elif name == "list_specs":
+            return  # reports load status instead of waiting for it
+        else:
+            sources = list(self.specs.values())
+        pending = [source for source in sources if not source.ready.is_set()]
+        partial = len(sources) > 1
+        if not pending or (partial and len(pending) < len(sources)):
+            return
+
+        start = time.monotonic()
+        waiters = {asyncio.ensure_future(source.ready.wait()) for source in pending}
+        try:
+            while True:
+                remaining = start + self.ready_timeout - time.monotonic()
+                if remaining <= 0:
+                    loading = [s.name for s in pending if not s.ready.is_set()]
+                    raise TimeoutError(
+                        f"Spec(s) {', '.join(loading)} still loading after "
+                        f"{self.ready_timeout:g}s; try again shortly"
+                    )
+                done, waiters = await asyncio.wait(
+                    waiters,
+                    timeout=min(PROGRESS_INTERVAL, remaining),
+                    return_when=(
+                        asyncio.FIRST_COMPLETED if partial else asyncio.ALL_COMPLETED
+                    ),
+                )
+                if not waiters or (partial and done):
+                    return
+                if progress:
+                    loading = [s for s in pending if not s.ready.is_set()]
+                    await progress(
+                        len(pending) - len(loading),
+                        len(pending),
+                        f"Waiting {time.monotonic() - start:.0f}s for "
+                        + ", ".join(f"{s.name} ({s.load_phase})" for s in loading),
+                    )
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _restore_evicted(
+        self,
+        name: str,
+        arguments: dict | None,
+        snapshots: Dict[str, Tuple[SpecIndex | None, int]],
+    ) -> Dict[str, Tuple[SpecIndex | None, int]]:
+        """Reload the evicted specs a tool call reads the body of
+
+        Searches and listings only read the indexes evicted specs keep, and
+        match_endpoint only needs the specs with a path matching its URL, so
+        a call covering every spec does not reload (and evict) all of them.
+
+        Returns:
+            snapshots, with those of reloaded specs replaced
+        """
+        if name in INDEX_ONLY_TOOLS:
+            return snapshots
+        url = (arguments or {}).get("url", "")
+        for spec, (index, _) in list(snapshots.items()):
+            source = self.specs[spec]
+            if index is None or not source.evicted:
+                continue
+            if name == "match_endpoint" and not any(self._path_matches(index, url)):
+                continue
+            await source.restore()
+            snapshots[spec] = source.snapshot
+        return snapshots
+
+    def _check_spec_argument(self, name: str, arguments: dict | None):
+        """Reject a tool call's spec argument before waiting for any spec to load
+
+        Raises:
+            ValueError: if it names no configured spec, or is missing when
+                the tool needs it
+        """
+        spec = (arguments or {}).get("spec")
+        if spec and spec not in self.specs:
+            raise ValueError(
+                f"Unknown spec: {spec} (available: {', '.join(self.specs)})"
+            )
+        if not spec and len(self.specs) > 1 and name not in CROSS_SPEC_TOOLS:
+            raise ValueError(
+                f"{name} needs a spec argument when several specs are hosted "
+                f"(one of: {', '.join(self.specs)})"
+            )
+
+    def _tool_snapshots(
+        self, name: str, arguments: dict | None
+    ) -> Dict[str, Tuple[SpecIndex | None, int]]:
+        """Return the current snapshots of the specs a tool call reads, by name
+
+        Calls covering every spec only read those that have loaded, except
+        list_specs, which reports on all of them.
+        """
+        spec = (arguments or {}).get("spec")
+        if spec:
+            return {spec: self.specs[spec].snapshot}
+        return {
+            spec: source.snapshot
+            for spec, source in self.specs.items()
+            if source.ready.is_set() or name == "list_specs"
+        }
+
+    async def _execute_tool(
+        self,
+        name: str,
+        arguments: dict | None,
+        snapshots: Dict[str, Tuple[SpecIndex | None, int]],
+    ) -> str:
+        """Run a tool call on the worker pool, within the tool's concurrency limit
+
+        If the MCP request is cancelled while the call is queued it never
+        starts; if it is already running, the worker is asked to stop at its
+        next check_cancelled() point.
+        """
+        if self.executor is None:
+            return self._call_tool(name, arguments, snapshots)
+
+        limit = self.tool_concurrency.get(name)
+        semaphore = None
+        if limit:
+            semaphore = self._tool_semaphores.setdefault(name, asyncio.Semaphore(limit))
+
+        async with semaphore or contextlib.nullcontext():
+            cancelled = threading.Event()
+            context = contextvars.copy_context()
+            context.run(_cancel_event.set, cancelled)
+            loop = asyncio.get_running_loop()
+            try:
+                return await loop.run_in_executor(
+                    self.executor,
+                    lambda: context.run(self._call_tool, name, arguments, snapshots),
+                )
+            except asyncio.CancelledError:
+                cancelled.set()
+                self.logger.info(f"Tool call cancelled: {name}")
+                raise
+
+    def _call_tool(
+        self,
+        name: str,
+        arguments: dict | None,
+        snapshots: Dict[str, Tuple[SpecIndex | None, int]],
+    ) -> str:
+        """Execute a tool call against the given spec snapshots and serialize it"""
+        fmt = (arguments or {}).get("format") or self.output_format
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown format: {fmt}")
+
+        if name == "list_specs":
+            return encode_response(self.list_specs(snapshots), fmt)
+        if not (arguments or {}).get("spec") and len(self.specs) > 1:
+            return encode_response(
+                self._call_cross_spec_tool(name, arguments, snapshots), fmt
+            )
+        token = _pinned_snapshot.set(next(iter(snapshots.values())))
+        try:
+            return self._call_spec_tool(name, arguments, fmt)
+        finally:
+            _pinned_snapshot.reset(token)
+
+    def _call_cross_spec_tool(
+        self,
+        name: str,
+        arguments: dict | None,
+        snapshots: Dict[str, Tuple[SpecIndex | None, int]],
+    ) -> Any:
+        """Run a search or match against every loaded spec
+
+        While some specs are still loading, they are listed under "loading":
+        in the match result, or next to the search results, which are then
+        wrapped in a "results" key.
+        """
+        arguments = arguments or {}
+        loading = [spec for spec in self.specs if spec not in snapshots]
+        if name == "match_endpoint":
+            result = self.match_endpoint_any(
+                snapshots,
+                arguments.get("url", ""),
+                arguments.get("method", ""),
+                self._max_bytes_argument(arguments),
+            )
+            return {**result, "loading": loading} if loading else result
+
+        query = arguments.get("query", "")
+        limit, offset = self._paging_arguments(arguments)
+        kind = "endpoints" if name == "search_endpoints" else "schemas"
+        results = self.search_specs(snapshots, kind, query, limit, offset)
+        self.logger.info(f"Found {len(results)} matching {kind} across specs")
+        return {"results": results, "loading": loading} if loading else results
+
+    def _call_spec_tool(self, name: str, arguments: dict | None, fmt: str) -> str:
+        """Execute a tool call against the pinned spec and serialize its result"""
+        if name == "search_endpoints":
+            query = arguments.get("query", "") if arguments else ""
+            limit, offset = self._paging_arguments(arguments)
+            self.logger.debug(f"Searching endpoints with query: {query}")
+            results = self.search_endpoints(query, limit, offset)
+            self.logger.info(f"Found {len(results)} matching endpoints")
+            return encode_response(results, fmt)
+
+        elif name == "get_endpoint":
+            path = arguments.get("path", "") if arguments else ""
+            method = arguments.get("method", "") if arguments else ""
+            max_bytes = self._max_bytes_argument(arguments)
+            self.logger.debug(f"Getting endpoint details for: {method} {path}")
+            result = self.get_endpoint_details(path, method, max_bytes)
+            return encode_response(result, fmt)
+
+        elif name == "match_endpoint":
+            url = arguments.get("url", "") if arguments else ""
+            method = arguments.get("method", "") if arguments else ""
+            max_bytes = self._max_bytes_argument(arguments)
+            self.logger.debug(f"Matching endpoint for: {method} {url}")
+            result = self.match_endpoint(url, method, max_bytes)
+            return encode_response(result, fmt)
+
+        elif name == "list_all_endpoints":
+            arguments = arguments or {}
+            limit = max(int(arguments.get("limit", DEFAULT_LIST_LIMIT)), 0)
+            self.logger.debug("Listing all endpoints")
+            result = self.list_endpoints(
+                limit,
+                arguments.get("cursor"),
+                arguments.get("tag"),
+                arguments.get("method"),
+            )
+            self.logger.info(f"Found {result.get('total', 0)} total endpoints")
+            return encode_response(result, fmt)
+
+        elif name == "search_schemas":
+            query = arguments.get("query", "") if arguments else ""
+            limit, offset = self._paging_arguments(arguments)
+            self.logger.debug(f"Searching schemas with query: {query}")
+            results = self.search_schemas(query, limit, offset)
+            self.logger.info(f"Found {len(results)} matching schemas")
+            return encode_response(results, fmt)
+
+        elif name == "get_schema":
+            schema_name = arguments.get("schema_name", "") if arguments else ""
+            max_bytes = self._max_bytes_argument(arguments)
+            self.logger.debug(f"Getting schema details for: {schema_name}")
+            result = self.get_schema_details(schema_name, max_bytes)
+            return encode_response(result, fmt)
+
+        elif name == "expand":
+            handle = arguments.get("handle", "") if arguments else ""
+            max_bytes = self._max_bytes_argument(arguments)
+            self.logger.debug(f"Expanding handle: {handle}")
+            result = self.expand_handle(handle, max_bytes)
+            return encode_response(result, fmt)
+
+        else:
+            self.logger.error(f"Unknown tool requested: {name}")
+            raise ValueError(f"Unknown tool: {name}")
+
+    def _paging_arguments(self, arguments: dict | None) -> Tuple[int, int]:
+        """Extract limit and offset tool arguments"""
+        arguments = arguments or {}
+        limit = int(arguments.get("limit", DEFAULT_SEARCH_LIMIT))
+        offset = int(arguments.get("offset", 0))
+        return max(limit, 0), max(offset, 0)
+
+    def _max_bytes_argument(self, arguments: dict | None) -> int | None:
+        """Extract the max_bytes tool argument, None when not given"""
+        max_bytes = (arguments or {}).get("max_bytes")
+        return None if max_bytes is None else int(max_bytes)
+
+    def search_endpoints(
+        self, query: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0
+    ) -> List[Dict]:
+        """Search endpoints by keyword, best matches first
+
+        Matches path, summary, description, tags and operationId.
+
+        Args:
+            query: Search term
+            limit: Maximum number of results to return
+            offset: Number of ranked results to skip
+
+        Returns:
+            List of matching endpoints
+        """
+        if not self.index:
+            return []
+
+        return [
+            self.index.endpoints[doc_id]
+            for doc_id, _ in self.index.endpoint_index.search(query, limit, offset)
+        ]
+
+    def get_endpoint_details(
+        self, path: str, method: str, max_bytes: int | None = None
+    ) -> Dict:
+        """Get full details for a specific endpoint
+
+        Args:
+            path: The templated path (e.g., "/users/{userId}")
+            method: The HTTP method
+            max_bytes: Response size budget, defaults to the server setting
+
+        Returns:
+            The endpoint details, with subtrees past the budget replaced by handles
+        """
+        if not self.spec or "paths" not in self.spec:
+            return {"error": "No spec loaded"}
+
+        path_data = self.spec["paths"].get(path, {})
+        method_data = path_data.get(method.lower(), {})
+
+        if method_data:
+            budget = self._budget(max_bytes)
+            handle = f"/endpoints/{method.upper()}/{escape_pointer_token(path)}"
+            result = {
+                "path": path,
+                "method": method.upper(),
+                "details": budget.apply(method_data, handle),
+            }
+            return self._mark_truncated(result, budget)
+        return {"error": f"Endpoint {method.upper()} {path} not found"}
+
+    def _budget(self, max_bytes: int | None) -> ResponseBudget:
+        return ResponseBudget(
+            self.max_response_bytes if max_bytes is None else max_bytes
+        )
+
+    def _mark_truncated(self, result: Dict, budget: ResponseBudget) -> Dict:
+        if budget.truncated:
+            result["truncated"] = True
+            result["note"] = TRUNCATION_NOTE
+        return result
+
+    def expand_handle(self, handle: str, max_bytes: int | None = None) -> Dict:
+        """Expand a placeholder handle left by a size-budgeted response
+
+        Handles are JSON pointers below "/schemas/<name>" (resolved schemas)
+        or "/endpoints/<METHOD>/<path>" (endpoint details), optionally ending
+        in "?from=<i>" to get only the entries of the list or object from
+        position i on. Resolved schemas are cached, so this only walks the
+        pointer.
+
+        Args:
+            handle: The "$handle" value of a placeholder
+            max_bytes: Response size budget, defaults to the server setting
+
+        Returns:
+            The subtree, itself trimmed to the budget
+        """
+        if not self.spec:
+            return {"error": "No spec loaded"}
+
+        pointer, sep, start = handle.rpartition("?from=")
+        if not sep or not start.isdigit():
+            pointer, sep, start = handle, "", "0"
+        tokens = [unescape_pointer_token(t) for t in pointer.split("/")[1:]]
+        if len(tokens) >= 2 and tokens[0] == "schemas":
+            root = self.get_schema_details(tokens[1], max_bytes=0)
+            current = root.get("schema")
+            rest = tokens[2:]
+        elif len(tokens) >= 3 and tokens[0] == "endpoints":
+            root = self.get_endpoint_details(tokens[2], tokens[1], max_bytes=0)
+            current = root.get("details")
+            rest = tokens[3:]
+        else:
+            return {"error": f"Invalid handle: {handle}"}
+
+        if current is None:
+            return root
+
+        for token in rest:
+            if isinstance(current, dict):
+                if token in current:
+                    current = current[token]
+                    continue
+                if token.isdigit() and int(token) in current:
+                    current = current[int(token)]
+                    continue
+            elif (
+                isinstance(current, list)
+                and token.isdigit()
+                and int(token) < len(current)
+            ):
+                current = current[int(token)]
+                continue
+            return {"error": f"Handle not found: {handle}"}
+
+        if sep:
+            if isinstance(current, dict):
+                current = dict(itertools.islice(current.items(), int(start), None))
+            elif isinstance(current, list):
+                current = current[int(start) :]
+            else:
+                return {"error": f"Handle not found: {handle}"}
+
+        budget = self._budget(max_bytes)
+        result = {"handle": handle, "value": budget.apply(current, pointer, int(start))}
+        return self._mark_truncated(result, budget)
 
-    def load_spec(self):
-        """Load OpenAPI spec from the specified file or URL"""
-        self.logger.info(f"Loading OpenAPI spec from {self.docs_source}")
+    def match_endpoint(
+        self, url: str, method: str, max_bytes: int | None = None
+    ) -> Dict:
+        """Find the operation serving a concrete URL or path
 
-        try:
-            if self._is_url(self.docs_source):
-                self._load_spec_from_url()
-            else:
-                self._load_spec_from_file()
+        Args:
+            url: A concrete path (e.g., "/v2/orgs/42/users") or full URL; server
+                base paths from the spec are stripped if present
+            method: The HTTP method
+            max_bytes: Response size budget, defaults to the server setting
 
-            if self.spec:
-                self.logger.info(
-                    f"Successfully loaded OpenAPI spec from {self.docs_source}"
-                )
-        except Exception as e:
-            self.logger.error(
-                f"Failed to load OpenAPI spec from {self.docs_source}: {e}"
-            )
-            self.spec = None
+        Returns:
+            The endpoint details plus the extracted path parameters
+        """
+        if not self.index:
+            return {"error": "No spec loaded"}
 
-    def _load_spec_from_url(self):
-        """Load OpenAPI spec from a URL"""
-        with urlopen(self.docs_source) as response:
-            content = response.read().decode("utf-8")
+        path = urlparse(url).path if is_url(url) else url.split("?", 1)[0]
+        allowed: List[str] = []
+        for candidate, operations in self._path_matches(self.index, url):
+            template = operations.get(method.upper())
+            if template is None:
+                allowed.extend(m for m in operations if m not in allowed)
+                continue
+            result = self.get_endpoint_details(template, method, max_bytes)
+            result["path_params"] = PathTrie.extract_params(template, candidate)
+            return result
 
-        # Try to determine format from URL or content
-        if self.docs_source.lower().endswith((".yaml", ".yml")):
-            self.spec = yaml.safe_load(content)
-        elif self.docs_source.lower().endswith(".json"):
-            self.spec = json.loads(content)
-        else:
-            # Try JSON first, then YAML
-            try:
-                self.spec = json.loads(content)
-            except json.JSONDecodeError:
-                self.spec = yaml.safe_load(content)
+        if allowed:
+            return {
+                "error": f"Method {method.upper()} not allowed for {path}",
+                "allowed_methods": allowed,
+            }
+        return {"error": f"No endpoint matches {path}"}
 
-    def _load_spec_from_file(self):
-        """Load OpenAPI spec from a local file"""
-        if self.docs_path is None:
-            self.logger.error("Cannot load from file: path is None")
-            return
+    @staticmethod
+    def _path_matches(
+        index: SpecIndex, url: str
+    ) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """Yield (path, operations by method) for the index's templates matching url
 
-        if not self.docs_path.exists():
-            self.logger.error(f"OpenAPI spec file not found: {self.docs_path}")
-            return
+        The path is tried as given and with each of the spec's server base
+        paths stripped.
+        """
+        path = urlparse(url).path if is_url(url) else url.split("?", 1)[0]
+        candidates = [path]
+        for base_path in index.base_paths:
+            if path == base_path or path.startswith(base_path + "/"):
+                candidates.append(path[len(base_path) :])
+        for candidate in candidates:
+            for operations in index.path_trie.match(candidate):
+                yield candidate, operations
 
-        with open(self.docs_path) as f:
-            if self.docs_path.suffix.lower() in [".yaml", ".yml"]:
-                self.spec = yaml.safe_load(f)
-            elif self.docs_path.suffix.lower() == ".json":
-                self.spec = json.load(f)
-            else:
-                raise ValueError(f"Unsupported file format: {self.docs_path.suffix}")
+    def match_endpoint_any(
+        self,
+        snapshots: Dict[str, Tuple[SpecIndex | None, int]],
+        url: str,
+        method: str,
+        max_bytes: int | None = None,
+    ) -> Dict:
+        """Find the operation serving a URL in any of the given specs
 
-    def setup_handlers(self):
-        @self.server.list_tools()
-        async def handle_list_tools() -> list[types.Tool]:
-            return [
-                types.Tool(
-                    name="search_endpoints",
-                    description="Search API endpoints by keyword",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {"type": "string", "description": "Search term"}
-                        },
-                        "required": ["query"],
-                    },
-                ),
-                types.Tool(
-                    name="get_endpoint",
-                    description="Get details for a specific endpoint",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "path": {"type": "string"},
-                            "method": {"type": "string"},
-                        },
-                        "required": ["path", "method"],
-                    },
-                ),
-                types.Tool(
-                    name="list_all_endpoints",
-                    description="List all available API endpoints",
-                    inputSchema={"type": "object", "properties": {}},
-                ),
-                types.Tool(
-                    name="search_schemas",
-                    description="Search schema definitions by name",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "Search term to match against schema names",
-                            }
-                        },
-                        "required": ["query"],
-                    },
-                ),
-                types.Tool(
-                    name="get_schema",
-                    description="Get a specific schema definition with all $ref references resolved",
-                    inputSchema={
-                        "type": "object",
-                        "properties": {
-                            "schema_name": {
-                                "type": "string",
-                                "description": "Name of the schema to retrieve",
-                            }
-                        },
-                        "required": ["schema_name"],
-                    },
-                ),
-            ]
+        Specs are tried in order and the first match wins; the result names
+        the spec it came from.
+        """
+        allowed: Dict[str, List[str]] = {}
+        for spec, snapshot in snapshots.items():
+            check_cancelled()
+            token = _pinned_snapshot.set(snapshot)
+            try:
+                result = self.match_endpoint(url, method, max_bytes)
+            finally:
+                _pinned_snapshot.reset(token)
+            if "error" not in result:
+                return {"spec": spec, **result}
+            if "allowed_methods" in result:
+                allowed[spec] = result["allowed_methods"]
 
-        @self.server.call_tool()
-        async def handle_call_tool(
-            name: str, arguments: dict | None
-        ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-            self.logger.info(f"Tool called: {name} with arguments: {arguments}")
+        path = urlparse(url).path if is_url(url) else url.split("?", 1)[0]
+        if allowed:
+            return {
+                "error": f"Method {method.upper()} not allowed for {path}",
+                "allowed_methods": allowed,
+            }
+        return {"error": f"No endpoint in any spec matches {path}"}
 
-            if name == "search_endpoints":
-                query = arguments.get("query", "") if arguments else ""
-                self.logger.debug(f"Searching endpoints with query: {query}")
-                results = self.search_endpoints(query)
-                self.logger.info(f"Found {len(results)} matching endpoints")
-                return [
-                    types.TextContent(type="text", text=json.dumps(results, indent=2))
-                ]
-
-            elif name == "get_endpoint":
-                path = arguments.get("path", "") if arguments else ""
-                method = arguments.get("method", "") if arguments else ""
-                self.logger.debug(f"Getting endpoint details for: {method} {path}")
-                result = self.get_endpoint_details(path, method)
-                return [
-                    types.TextContent(type="text", text=json.dumps(result, indent=2))
-                ]
-
-            elif name == "list_all_endpoints":
-                self.logger.debug("Listing all endpoints")
-                results = self.list_endpoints()
-                self.logger.info(f"Found {len(results)} total endpoints")
-                return [
-                    types.TextContent(type="text", text=json.dumps(results, indent=2))
-                ]
-
-            elif name == "search_schemas":
-                query = arguments.get("query", "") if arguments else ""
-                self.logger.debug(f"Searching schemas with query: {query}")
-                results = self.search_schemas(query)
-                self.logger.info(f"Found {len(results)} matching schemas")
-                return [
-                    types.TextContent(type="text", text=json.dumps(results, indent=2))
-                ]
-
-            elif name == "get_schema":
-                schema_name = arguments.get("schema_name", "") if arguments else ""
-                self.logger.debug(f"Getting schema details for: {schema_name}")
-                result = self.get_schema_details(schema_name)
-                return [
-                    types.TextContent(type="text", text=json.dumps(result, indent=2))
-                ]
+    def list_endpoints(
+        self,
+        limit: int = DEFAULT_LIST_LIMIT,
+        cursor: str | None = None,
+        tag: str | None = None,
+        method: str | None = None,
+    ) -> Dict:
+        """List available endpoints one page at a time, sorted by path and method
 
-            else:
-                self.logger.error(f"Unknown tool requested: {name}")
-                raise ValueError(f"Unknown tool: {name}")
+        Args:
+            limit: Maximum number of endpoints in the page
+            cursor: The next_cursor of the previous page, None for the first page
+            tag: Only list endpoints with this tag (case-insensitive)
+            method: Only list endpoints with this HTTP method
 
-    def search_endpoints(self, query: str) -> List[Dict]:
-        """Search endpoints by keyword in path, summary, or description"""
-        results = []
-        if not self.spec or "paths" not in self.spec:
-            return results
-
-        query_lower = query.lower()
-        for path, methods in self.spec["paths"].items():
-            if isinstance(methods, dict):
-                for method, details in methods.items():
-                    if method in ["get", "post", "put", "delete", "patch"]:
-                        if (
-                            query_lower in path.lower()
-                            or query_lower in details.get("summary", "").lower()
-                            or query_lower in details.get("description", "").lower()
-                            or any(
-                                query_lower in tag.lower()
-                                for tag in details.get("tags", [])
-                            )
-                        ):
-                            results.append(
-                                {
-                                    "path": path,
-                                    "method": method.upper(),
-                                    "summary": details.get("summary", ""),
-                                    "tags": details.get("tags", []),
-                                }
-                            )
-        return results
-
-    def get_endpoint_details(self, path: str, method: str) -> Dict:
-        """Get full details for a specific endpoint"""
-        if not self.spec or "paths" not in self.spec:
-            return {"error": "No spec loaded"}
+        Cursors are bound to the filters and the spec generation they were
+        issued for, and rejected under other filters or once the spec has
+        been reloaded.
 
-        path_data = self.spec["paths"].get(path, {})
-        method_data = path_data.get(method.lower(), {})
+        Returns:
+            The page of endpoints, the total count for the filters, and the
+            cursor of the next page (None on the last page)
+        """
+        if not self.index:
+            return {"endpoints": [], "total": 0, "next_cursor": None}
 
-        if method_data:
-            return {"path": path, "method": method.upper(), "details": method_data}
-        return {"error": f"Endpoint {method.upper()} {path} not found"}
+        filters = (tag.lower() if tag else None, method.upper() if method else None)
+        start = 0
+        if cursor:
+            try:
+                state = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+                generation, cursor_filters, start = state
+            except (ValueError, TypeError):
+                return {"error": f"Invalid cursor: {cursor}"}
+            if not isinstance(start, int) or start < 0:
+                return {"error": f"Invalid cursor: {cursor}"}
+            if cursor_filters != list(filters):
+                return {
+                    "error": "Cursor was issued for other tag or method filters; "
+                    "pass the same filters or start again without a cursor"
+                }
+            if generation != self.generation:
+                return {
+                    "error": "Stale cursor: the spec has been reloaded since; "
+                    "start again without a cursor"
+                }
 
-    def list_endpoints(self) -> List[Dict]:
-        """List all available endpoints"""
-        results = []
-        if not self.spec or "paths" not in self.spec:
-            return results
-
-        for path, methods in self.spec["paths"].items():
-            if isinstance(methods, dict):
-                for method, details in methods.items():
-                    if method in ["get", "post", "put", "delete", "patch"]:
-                        results.append(
-                            {
-                                "path": path,
-                                "method": method.upper(),
-                                "summary": details.get("summary", ""),
-                            }
-                        )
-        return results
+        table = self.index.operation_tables.get(filters, [])
+        end = min(start + limit, len(table))
+        endpoints = []
+        for endpoint_id in table[start:end]:
+            endpoint = self.index.endpoints[endpoint_id]
+            endpoints.append(
+                {
+                    "path": endpoint["path"],
+                    "method": endpoint["method"],
+                    "summary": endpoint["summary"],
+                }
+            )
+        next_cursor = None
+        if end < len(table):
+            state = json.dumps([self.generation, filters, end])
+            next_cursor = base64.urlsafe_b64encode(state.encode("ascii")).decode(
+                "ascii"
+            )
+        return {"endpoints": endpoints, "total": len(table), "next_cursor": next_cursor}
 
-    def resolve_schema_ref(self, ref: str, visited: set[str] | None = None) -> Dict:
+    def resolve_schema_ref(self, ref: str) -> Dict:
         """Resolve a $ref reference to its actual schema definition
 
+        The references reachable from ref are resolved in one pass over the
+        reference graph: its strongly connected components are found with
+        Tarjan's algorithm and expanded in reverse topological order, so every
+        referenced schema is expanded exactly once and reused wherever it is
+        referenced, however many paths lead to it. References between schemas
+        of the same cycle are replaced by a "Circular reference detected"
+        error instead of being expanded.
+
+        Resolved schemas are cached per spec and share structure with the
+        loaded spec and with each other, so the result must be treated as
+        read-only.
+
         Args:
             ref: The reference string (e.g., "#/components/schemas/MySchema" or "#/definitions/MySchema")
-            visited: Set of already visited references to prevent circular dependencies
 
         Returns:
             The resolved schema definition with all nested $ref resolved
         """
-        if visited is None:
-            visited = set()
+        if not self.spec or not self.index:
+            return {"error": "No spec loaded"}
 
-        if ref in visited:
-            return {"error": f"Circular reference detected: {ref}"}
+        resolved = self.index.resolved_refs
+        if ref in resolved:
+            return resolved[ref]
 
-        visited.add(ref)
+        # Iterative Tarjan over the references reachable from ref. Refs that are
+        # already resolved belong to finished components and are skipped.
+        order: Dict[str, int] = {ref: 0}
+        low: Dict[str, int] = {ref: 0}
+        stack = [ref]
+        on_stack = {ref}
+        work = [(ref, iter(self._ref_edges(ref)))]
+        while work:
+            check_cancelled()
+            node, edges = work[-1]
+            for target in edges:
+                if target in resolved:
+                    continue
+                if target not in order:
+                    order[target] = low[target] = len(order)
+                    stack.append(target)
+                    on_stack.add(target)
+                    work.append((target, iter(self._ref_edges(target))))
+                    break
+                if target in on_stack:
+                    low[node] = min(low[node], order[target])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order[node]:
+                    component = set()
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.add(member)
+                        if member == node:
+                            break
+                    if len(component) == 1 and node not in self._ref_edges(node):
+                        component = set()
+                    for member in component or (node,):
+                        resolved[member] = self._expand_ref(member, component)
 
-        if not self.spec:
-            return {"error": "No spec loaded"}
+        return resolved[ref]
 
+    def _lookup_ref(self, ref: str) -> Tuple[Any, str | None]:
+        """Return the spec node a $ref points to, or None and an error message"""
         # Parse the reference path
         # Supports both OpenAPI 3.0 (#/components/schemas/...) and Swagger 2.0 (#/definitions/...)
         if not ref.startswith("#/"):
-            return {"error": f"Invalid reference format: {ref}"}
+            return None, f"Invalid reference format: {ref}"
 
         ref_path = ref[2:].split("/")  # Remove "#/" and split
 
         # Navigate through the spec to find the referenced schema
         current = self.spec
         for part in ref_path:
-            if isinstance(current, dict) and part in current:
+            if isinstance(current, Mapping) and part in current:
                 current = current[part]
             else:
-                return {"error": f"Reference not found: {ref}"}
+                return None, f"Reference not found: {ref}"
+        return current, None
+
+    @property
+    def _loaded_index(self) -> SpecIndex:
+        """The pinned index, for helpers only reached once a spec is loaded"""
+        index = self.index
+        if index is None:
+            raise ValueError("No spec loaded")
+        return index
 
-        # Deep copy to avoid modifying the original spec
-        import copy
+    def _ref_edges(self, ref: str) -> List[str]:
+        """Return the $refs directly used by the node ref points to (cached)"""
+        edges = self._loaded_index.ref_edges.get(ref)
+        if edges is not None:
+            return edges
 
-        schema = copy.deepcopy(current)
+        edges = []
+        node, _ = self._lookup_ref(ref)
+        pending = [node]
+        while pending:
+            obj = pending.pop()
+            if isinstance(obj, dict):
+                target = obj.get("$ref")
+                if isinstance(target, str):
+                    edges.append(target)
+                else:
+                    pending.extend(obj.values())
+            elif isinstance(obj, list):
+                pending.extend(obj)
+        self._loaded_index.ref_edges[ref] = edges
+        return edges
 
-        # Recursively resolve any nested $ref in the schema
-        schema = self._resolve_nested_refs(schema, visited)
+    def _expand_ref(self, ref: str, cycle: set[str]) -> Any:
+        """Expand the node ref points to, substituting already resolved refs
+
+        Refs to members of cycle (the component ref belongs to, if cyclic) are
+        replaced by a circular reference error.
+        """
+        node, error = self._lookup_ref(ref)
+        if error:
+            return {"error": error}
+        return self._resolve_nested_refs(node, cycle)
 
-        return schema
+    def _resolve_nested_refs(self, obj: Any, cycle: set[str]) -> Any:
+        """Recursively substitute resolved schemas for all $ref in a schema object
 
-    def _resolve_nested_refs(self, obj: Any, visited: set[str]) -> Any:
-        """Recursively resolve all $ref in a schema object"""
+        Subtrees without any substituted $ref are returned as-is instead of
+        being copied.
+        """
         if isinstance(obj, dict):
-            if "$ref" in obj:
-                ref = obj["$ref"]
-                resolved = self.resolve_schema_ref(ref, visited.copy())
+            ref = obj.get("$ref")
+            if isinstance(ref, str):
+                if ref in cycle:
+                    resolved = {"error": f"Circular reference detected: {ref}"}
+                else:
+                    resolved = self._loaded_index.resolved_refs[ref]
                 # Merge any additional properties that might exist alongside $ref
-                for key, value in obj.items():
-                    if key != "$ref" and key not in resolved:
-                        resolved[key] = value
+                if isinstance(resolved, dict):
+                    extra = {
+                        key: value
+                        for key, value in obj.items()
+                        if key != "$ref" and key not in resolved
+                    }
+                    if extra:
+                        resolved = {**resolved, **extra}
                 return resolved
-            else:
-                return {
-                    key: self._resolve_nested_refs(value, visited)
-                    for key, value in obj.items()
-                }
+
+            result = {}
+            changed = False
+            for key, value in obj.items():
+                resolved = self._resolve_nested_refs(value, cycle)
+                result[key] = resolved
+                changed = changed or resolved is not value
+            return result if changed else obj
         elif isinstance(obj, list):
-            return [self._resolve_nested_refs(item, visited) for item in obj]
+            result = [self._resolve_nested_refs(item, cycle) for item in obj]
+            changed = any(new is not old for new, old in zip(result, obj))
+            return result if changed else obj
         else:
             return obj
 
-    def search_schemas(self, query: str) -> List[Dict]:
-        """Search schema definitions by name or description
+    def search_schemas(
+        self, query: str, limit: int = DEFAULT_SEARCH_LIMIT, offset: int = 0
+    ) -> List[Dict]:
+        """Search schema definitions by name, best matches first
 
         Args:
             query: Search term to match against schema names
+            limit: Maximum number of results to return
+            offset: Number of ranked results to skip
 
         Returns:
             List of matching schema names and their descriptions
         """
-        results = []
-        if not self.spec:
-            return results
+        if not self.index:
+            return []
 
-        # Support both OpenAPI 3.0 (components/schemas) and Swagger 2.0 (definitions)
-        schemas = None
-        if "components" in self.spec and "schemas" in self.spec["components"]:
-            schemas = self.spec["components"]["schemas"]
-            prefix = "#/components/schemas/"
-        elif "definitions" in self.spec:
-            schemas = self.spec["definitions"]
-            prefix = "#/definitions/"
-        else:
-            return results
+        return [
+            self.index.schemas[doc_id]
+            for doc_id, _ in self.index.schema_index.search(query, limit, offset)
+        ]
 
-        query_lower = query.lower()
-        for schema_name, schema_def in schemas.items():
-            if query_lower in schema_name.lower():
-                description = ""
-                if isinstance(schema_def, dict):
-                    description = schema_def.get(
-                        "description", schema_def.get("title", "")
-                    )
+    def search_specs(
+        self,
+        snapshots: Dict[str, Tuple[SpecIndex | None, int]],
+        kind: str,
+        query: str,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+        offset: int = 0,
+    ) -> List[Dict]:
+        """Search endpoints or schemas of several specs, merging their rankings
 
-                results.append(
-                    {
-                        "name": schema_name,
-                        "ref": f"{prefix}{schema_name}",
-                        "description": description,
-                        "type": schema_def.get("type", "object")
-                        if isinstance(schema_def, dict)
-                        else "unknown",
-                    }
-                )
+        Each spec's index ranks its own top limit + offset documents, which are
+        then merged by BM25 score and tagged with the spec they came from.
+
+        Args:
+            snapshots: Spec snapshots to search, by spec name
+            kind: "endpoints" or "schemas"
+            query: Search term
+            limit: Maximum number of results to return
+            offset: Number of ranked results to skip
 
-        return results
+        Returns:
+            List of matching endpoints or schemas, each with a "spec" key
+        """
+        ranked = []
+        for spec, (index, _) in snapshots.items():
+            check_cancelled()
+            if index is None:
+                continue
+            search_index = (
+                index.endpoint_index if kind == "endpoints" else index.schema_index
+            )
+            documents = index.endpoints if kind == "endpoints" else index.schemas
+            for doc_id, score in search_index.search(query, limit + offset, 0):
+                ranked.append((score, spec, documents[doc_id]))
+
+        best = heapq.nlargest(limit + offset, ranked, key=lambda item: item[0])
+        return [{"spec": spec, **document} for _, spec, document in best[offset:]]
 
-    def get_schema_details(self, schema_name: str) -> Dict:
+    def get_schema_details(
+        self, schema_name: str, max_bytes: int | None = None
+    ) -> Dict:
         """Get full details for a specific schema with all references resolved
 
         Args:
             schema_name: Name of the schema (e.g., "PersonaSimplificada")
+            max_bytes: Response size budget, defaults to the server setting
 
         Returns:
-            The schema definition with all $ref resolved
+            The schema definition with all $ref resolved, with subtrees past the
+            budget replaced by handles
         """
         if not self.spec:
             return {"error": "No spec loaded"}
@@ -400,25 +3697,246 @@ class OpenAPIServer:
 
         resolved = self.resolve_schema_ref(ref)
 
-        return {"name": schema_name, "ref": ref, "schema": resolved}
+        budget = self._budget(max_bytes)
+        handle = f"/schemas/{escape_pointer_token(schema_name)}"
+        result = {
+            "name": schema_name,
+            "ref": ref,
+            "schema": budget.apply(resolved, handle),
+        }
+        return self._mark_truncated(result, budget)
+
+    def list_specs(
+        self, snapshots: Dict[str, Tuple[SpecIndex | None, int]]
+    ) -> List[Dict]:
+        """Describe the hosted specs
+
+        Returns:
+            One entry per spec with its name, source, whether it is loaded or
+            still loading, its endpoint and schema counts, and its resident
+            size and eviction counters
+        """
+        specs = []
+        for spec, (index, generation) in snapshots.items():
+            source = self.specs[spec]
+            specs.append(
+                {
+                    "spec": spec,
+                    "source": source.docs_source,
+                    "loaded": index is not None and not source.evicted,
+                    "loading": not source.ready.is_set(),
+                    "phase": source.load_phase,
+                    "generation": generation,
+                    "endpoints": len(index.endpoints) if index else 0,
+                    "schemas": len(index.schemas) if index else 0,
+                    "resident_bytes": index.resident_bytes if index else 0,
+                    "evicted": source.evicted,
+                    "evictions": source.evictions,
+                    "restores": source.restores,
+                }
+            )
+        return specs
+
+    async def run(
+        self,
+        transport: str = "stdio",
+        host: str = DEFAULT_HTTP_HOST,
+        port: int = DEFAULT_HTTP_PORT,
+        keep_alive: int = DEFAULT_HTTP_KEEP_ALIVE,
+        socket_path: Path | None = None,
+        idle_timeout: int = DEFAULT_DAEMON_IDLE_TIMEOUT,
+    ):
+        tasks = [asyncio.create_task(self.load_specs())]
+        if self.response_cache and self.logger.isEnabledFor(logging.DEBUG):
+            tasks.append(
+                asyncio.create_task(self.log_cache_stats(CACHE_STATS_INTERVAL))
+            )
+        for source in self.specs.values():
+            if self.watch and source.docs_path is not None:
+                tasks.append(asyncio.create_task(source.watch_spec()))
+            elif source.fetcher is not None and self.refresh_interval > 0:
+                tasks.append(
+                    asyncio.create_task(
+                        source.refresh_remote_spec(self.refresh_interval)
+                    )
+                )
+        try:
+            if transport == "http":
+                await self._run_http(host, port, keep_alive)
+            elif transport == "unix":
+                if socket_path is None:
+                    raise ValueError("The unix transport needs a socket path")
+                await self._run_unix(socket_path, idle_timeout)
+            else:
+                await self._run_stdio()
+        finally:
+            for task in tasks:
+                task.cancel()
+            if self.executor:
+                self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def log_cache_stats(self, interval: float):
+        """Log the response cache's counters at DEBUG level every interval seconds"""
+        if self.response_cache is None:
+            return
+        while True:
+            await asyncio.sleep(interval)
+            stats = self.response_cache.stats()
+            self.logger.debug(
+                "Response cache: "
+                + ", ".join(f"{name} {value}" for name, value in stats.items())
+            )
+
+    def _initialization_options(self) -> "InitializationOptions":
+        from mcp.server import NotificationOptions
+        from mcp.server.models import InitializationOptions
 
-    async def run(self):
-        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+        return InitializationOptions(
+            server_name="openapi-docs",
+            server_version="0.1.0",
+            capabilities=self.server.get_capabilities(
+                notification_options=NotificationOptions(),
+                experimental_capabilities={},
+            ),
+        )
+
+    async def _run_stdio(self):
+        from mcp.server.stdio import stdio_server
+
+        async with stdio_server() as (read_stream, write_stream):
+            startup_profile.mark("transport ready")
             await self.server.run(
-                read_stream,
-                write_stream,
-                InitializationOptions(
-                    server_name="openapi-docs",
-                    server_version="0.1.0",
-                    capabilities=self.server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={},
-                    ),
-                ),
+                read_stream, write_stream, self._initialization_options()
             )
 
+    async def _run_unix(self, socket_path: Path, idle_timeout: int):
+        """Serve MCP sessions to stdio shims connecting over a Unix socket
 
-async def main():
+        Each connection is an independent MCP session using the stdio framing,
+        sharing this process's loaded spec, indexes and caches. The daemon
+        exits on SIGINT/SIGTERM, or once it has had no clients for
+        idle_timeout seconds (0 to never exit).
+        """
+        import anyio
+        from mcp.server.stdio import stdio_server
+
+        if socket_path.exists():
+            sock = _connect_unix(socket_path)
+            if sock:
+                sock.close()
+                raise RuntimeError(f"A daemon is already listening on {socket_path}")
+            socket_path.unlink()  # left behind by a daemon that crashed
+
+        clients = 0
+        last_active = time.monotonic()
+
+        async def handle_connection(stream):
+            nonlocal clients, last_active
+            clients += 1
+            self.logger.info(f"Daemon client connected ({clients} active)")
+            try:
+                async with stream:
+                    # Duck-types the anyio.AsyncFile stdio_server expects
+                    lines: Any = SocketLineStream(stream)
+                    async with stdio_server(lines, lines) as (
+                        read_stream,
+                        write_stream,
+                    ):
+                        await self.server.run(
+                            read_stream, write_stream, self._initialization_options()
+                        )
+            except (anyio.BrokenResourceError, anyio.ClosedResourceError) as e:
+                self.logger.debug(f"Daemon client went away: {e!r}")
+            finally:
+                clients -= 1
+                last_active = time.monotonic()
+                self.logger.info(f"Daemon client disconnected ({clients} active)")
+
+        async def exit_when_idle(scope: anyio.CancelScope):
+            while True:
+                await anyio.sleep(1)
+                if clients == 0 and time.monotonic() - last_active >= idle_timeout:
+                    self.logger.info(f"No clients for {idle_timeout}s, exiting")
+                    scope.cancel()
+                    return
+
+        listener = await anyio.create_unix_listener(socket_path, mode=0o600)
+        loop = asyncio.get_running_loop()
+        try:
+            async with listener, anyio.create_task_group() as tg:
+                for sig in (signal.SIGINT, signal.SIGTERM):
+                    loop.add_signal_handler(sig, tg.cancel_scope.cancel)
+                if idle_timeout > 0:
+                    tg.start_soon(exit_when_idle, tg.cancel_scope)
+                self.logger.info(f"Daemon listening on {socket_path}")
+                startup_profile.mark("transport ready")
+                await listener.serve(handle_connection, task_group=tg)
+        finally:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+            with contextlib.suppress(FileNotFoundError):
+                socket_path.unlink()
+            self.logger.info("Daemon stopped")
+
+    async def _run_http(self, host: str, port: int, keep_alive: int):
+        """Serve MCP over Streamable HTTP (with SSE streams) at /mcp
+
+        Every client gets its own MCP session, tracked by the Mcp-Session-Id
+        header, while all of them share this process's loaded spec, indexes
+        and caches. SIGINT/SIGTERM stop accepting connections and give open
+        requests HTTP_SHUTDOWN_TIMEOUT seconds to finish.
+        """
+        import uvicorn
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        from starlette.applications import Starlette
+        from starlette.routing import Route
+
+        session_manager = StreamableHTTPSessionManager(app=self.server)
+
+        class MCPEndpoint:
+            async def __call__(self, scope, receive, send):
+                await session_manager.handle_request(scope, receive, send)
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            async with session_manager.run():
+                self.logger.info(f"Serving MCP over HTTP at http://{host}:{port}/mcp")
+                startup_profile.mark("transport ready")
+                yield
+            self.logger.info("HTTP transport stopped")
+
+        app = Starlette(
+            routes=[Route("/mcp", endpoint=MCPEndpoint())], lifespan=lifespan
+        )
+        config = uvicorn.Config(
+            app,
+            host=host,
+            port=port,
+            timeout_keep_alive=keep_alive,
+            timeout_graceful_shutdown=HTTP_SHUTDOWN_TIMEOUT,
+            log_config=None,
+        )
+
+        class Server(uvicorn.Server):
+            # Shut down gracefully on SIGINT/SIGTERM without uvicorn re-raising
+            # the signal afterwards, which would interrupt the session
+            # manager's cleanup
+            @contextlib.contextmanager
+            def capture_signals(self):
+                yield
+
+        server = Server(config)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, server.handle_exit, sig, None)
+        try:
+            await server.serve()
+        finally:
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                loop.remove_signal_handler(sig)
+
+
+def setup_logging():
     logging.basicConfig(
         level=logging.INFO,
         format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -427,13 +3945,74 @@ async def main():
         ],
     )
 
+
+def compile_command(argv: List[str]):
+    """Build a spec bundle ahead of time: openapi-spec-mcp compile SPEC -o BUNDLE"""
+    setup_logging()
+    logger = logging.getLogger(__name__)
+
+    parser = argparse.ArgumentParser(
+        prog="openapi-spec-mcp compile",
+        description="Parse and index an OpenAPI spec into a bundle that the "
+        "server loads without parsing or indexing at startup",
+    )
+    parser.add_argument("spec", help="OpenAPI spec file (YAML or JSON) or URL")
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help=f"Bundle to write (default: NAME{BUNDLE_SUFFIX} in the current directory)",
+    )
+    parser.add_argument(
+        "--log-level",
+        default="INFO",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        help="Set the logging level (default: INFO)",
+    )
+    args = parser.parse_args(argv)
+    logging.getLogger().setLevel(getattr(logging, args.log_level))
+    logging.getLogger("httpx").setLevel(max(logging.WARNING, logging.getLogger().level))
+
+    source = SpecSource(spec_name(args.spec), args.spec)
+    index = source.index if source.load_spec() else None
+    if index is None:
+        sys.exit(1)
+    output = args.output or Path(f"{source.name}{BUNDLE_SUFFIX}")
+    try:
+        write_spec_bundle(output, index, args.spec)
+    except OSError as e:
+        logger.error(f"Failed to write bundle {output}: {e}")
+        sys.exit(1)
+    logger.info(f"Wrote {output} ({output.stat().st_size} bytes)")
+
+
+async def main():
+    setup_logging()
+
     logger = logging.getLogger(__name__)
     logger.info("Starting OpenAPI MCP Server")
 
-    parser = argparse.ArgumentParser(description="OpenAPI MCP Server")
+    parser = argparse.ArgumentParser(
+        description="OpenAPI MCP Server",
+        epilog="Run 'openapi-spec-mcp compile --help' to prebuild a spec bundle.",
+    )
     parser.add_argument(
         "docs_path",
-        help="Full path to OpenAPI spec file (YAML or JSON) or URL to remote spec",
+        nargs="*",
+        help="OpenAPI spec files (YAML or JSON) or bundles, directories of them, "
+        "glob patterns or URLs to remote specs, each optionally as NAME=LOCATION",
+    )
+    parser.add_argument(
+        "--config",
+        type=Path,
+        help="YAML or JSON file listing specs under a 'specs' key, as a list of "
+        "locations or a mapping of names to locations",
+    )
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="Print a breakdown of startup time by phase to stderr once the "
+        "transport is up and every spec has loaded",
     )
     parser.add_argument(
         "--log-level",
@@ -441,22 +4020,232 @@ async def main():
         choices=["DEBUG", "INFO", "WARNING", "ERROR"],
         help="Set the logging level (default: INFO)",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=default_cache_dir(),
+        help="Directory for compiled spec snapshots "
+        "(default: $XDG_CACHE_HOME/openapi-spec-mcp)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the spec instead of using a compiled snapshot",
+    )
+    parser.add_argument(
+        "--no-watch",
+        action="store_true",
+        help="Do not reload a local spec file when it changes",
+    )
+    parser.add_argument(
+        "--fetch-timeout",
+        type=float,
+        default=DEFAULT_FETCH_TIMEOUT,
+        help="Seconds to wait on a remote spec URL per attempt "
+        f"(default: {DEFAULT_FETCH_TIMEOUT:g})",
+    )
+    parser.add_argument(
+        "--fetch-retries",
+        type=int,
+        default=DEFAULT_FETCH_RETRIES,
+        help="Retries with exponential backoff when fetching a remote spec fails "
+        f"(default: {DEFAULT_FETCH_RETRIES})",
+    )
+    parser.add_argument(
+        "--refresh-interval",
+        type=float,
+        default=0,
+        help="Seconds between background revalidations of a remote spec URL "
+        "(default: 0, fetch only at startup)",
+    )
+    parser.add_argument(
+        "--max-response-bytes",
+        type=int,
+        default=DEFAULT_MAX_RESPONSE_BYTES,
+        help="Approximate size budget for get_schema/get_endpoint responses, "
+        "roughly 4 bytes per LLM token; larger subtrees are replaced by handles "
+        f"for the expand tool (default: {DEFAULT_MAX_RESPONSE_BYTES}, 0 for unlimited)",
+    )
+    parser.add_argument(
+        "--transport",
+        default="stdio",
+        choices=["stdio", "http", "unix"],
+        help="Serve one client over stdio, many over Streamable HTTP, or many "
+        "stdio shims over a Unix socket (default: stdio)",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="With stdio, proxy to a shared daemon for this spec over a Unix "
+        "socket, starting it with these options if none is running",
+    )
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        help="Unix socket for --transport unix and --daemon "
+        "(default: per-spec socket in $XDG_RUNTIME_DIR)",
+    )
+    parser.add_argument(
+        "--daemon-idle-timeout",
+        type=int,
+        default=DEFAULT_DAEMON_IDLE_TIMEOUT,
+        help="Seconds a daemon with no connected clients waits before exiting "
+        f"(default: {DEFAULT_DAEMON_IDLE_TIMEOUT}, 0 to never exit)",
+    )
+    parser.add_argument(
+        "--host",
+        default=DEFAULT_HTTP_HOST,
+        help=f"Address to listen on with --transport http (default: {DEFAULT_HTTP_HOST})",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=DEFAULT_HTTP_PORT,
+        help=f"Port to listen on with --transport http (default: {DEFAULT_HTTP_PORT})",
+    )
+    parser.add_argument(
+        "--http-keep-alive",
+        type=int,
+        default=DEFAULT_HTTP_KEEP_ALIVE,
+        help="Seconds to keep idle HTTP connections open "
+        f"(default: {DEFAULT_HTTP_KEEP_ALIVE})",
+    )
+    parser.add_argument(
+        "--format",
+        default="json",
+        choices=OUTPUT_FORMATS,
+        help="Default response format: indented JSON, minified JSON, YAML, or "
+        "TypeScript-like declarations for schemas (default: json)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Worker threads running tool calls off the event loop "
+        f"(default: {DEFAULT_WORKERS}, 0 to run them on the event loop)",
+    )
+    parser.add_argument(
+        "--load-processes",
+        type=int,
+        default=DEFAULT_LOAD_PROCESSES,
+        help="Worker processes parsing and indexing specs at startup when several "
+        f"need it (default: {DEFAULT_LOAD_PROCESSES}, 0 to load them on threads)",
+    )
+    parser.add_argument(
+        "--spec-memory-bytes",
+        type=int,
+        default=DEFAULT_SPEC_MEMORY_BYTES,
+        help="Memory budget for loaded specs; least recently used specs past it "
+        "are evicted and reloaded from their snapshot on demand (default: 0, "
+        "unlimited)",
+    )
+    parser.add_argument(
+        "--stream-min-bytes",
+        type=int,
+        default=DEFAULT_STREAM_MIN_BYTES,
+        help="Parse local spec files of at least this size one operation and "
+        "schema at a time, keeping them as compact blobs instead of one large "
+        f"object tree (default: {DEFAULT_STREAM_MIN_BYTES}, 0 for every spec; "
+        "JSON needs the ijson package)",
+    )
+    parser.add_argument(
+        "--ready-timeout",
+        type=float,
+        default=DEFAULT_READY_TIMEOUT,
+        help="Seconds a tool call waits for its spec to finish loading before "
+        f"failing (default: {DEFAULT_READY_TIMEOUT:g})",
+    )
+    parser.add_argument(
+        "--tool-concurrency",
+        action="append",
+        default=[],
+        metavar="TOOL=N",
+        help="Run at most N concurrent calls of TOOL, e.g. get_schema=2 (repeatable)",
+    )
+    parser.add_argument(
+        "--response-cache-bytes",
+        type=int,
+        default=DEFAULT_RESPONSE_CACHE_BYTES,
+        help="Size of the in-memory cache of encoded tool responses "
+        f"(default: {DEFAULT_RESPONSE_CACHE_BYTES}, 0 to disable)",
+    )
     args = parser.parse_args()
 
     logging.getLogger().setLevel(getattr(logging, args.log_level))
+    startup_profile.enabled = args.startup_profile
+    # httpx logs every request at INFO, which is noise with --refresh-interval
+    logging.getLogger("httpx").setLevel(max(logging.WARNING, logging.getLogger().level))
     logger.info(f"Log level set to {args.log_level}")
 
+    tool_concurrency = {}
+    for limit in args.tool_concurrency:
+        tool, _, count = limit.partition("=")
+        if not count.isdigit():
+            parser.error(f"--tool-concurrency expects TOOL=N, got {limit!r}")
+        tool_concurrency[tool] = int(count)
+
+    spec_arguments = list(args.docs_path)
+    if args.config:
+        spec_arguments += read_spec_config(args.config)
+    try:
+        specs = expand_spec_locations(spec_arguments)
+    except ValueError as e:
+        parser.error(str(e))
+    if not specs:
+        parser.error("no specs given (pass spec locations or --config)")
+
+    socket_path = args.socket
+    if socket_path is None and (args.daemon or args.transport == "unix"):
+        socket_path = daemon_socket_path(specs)
+    if args.daemon and args.transport == "stdio":
+        # The shim never loads the spec; the daemon is started with the same
+        # options, so the first shim for a spec decides how it is served
+        daemon_argv = [sys.executable, os.path.abspath(__file__)]
+        daemon_argv += [arg for arg in sys.argv[1:] if arg != "--daemon"]
+        daemon_argv += ["--transport", "unix", "--socket", str(socket_path)]
+        await asyncio.to_thread(run_shim, socket_path, daemon_argv)
+        return
+
     try:
-        server = OpenAPIServer(args.docs_path)
+        server = OpenAPIServer(
+            specs,
+            cache_dir=None if args.no_cache else args.cache_dir,
+            max_response_bytes=args.max_response_bytes,
+            workers=args.workers,
+            tool_concurrency=tool_concurrency,
+            response_cache_bytes=args.response_cache_bytes,
+            output_format=args.format,
+            load_processes=args.load_processes,
+            spec_memory_bytes=args.spec_memory_bytes,
+            ready_timeout=args.ready_timeout,
+            watch=not args.no_watch,
+            fetch_timeout=args.fetch_timeout,
+            fetch_retries=args.fetch_retries,
+            refresh_interval=args.refresh_interval,
+            stream_min_bytes=args.stream_min_bytes,
+        )
         logger.info("Server initialized successfully")
-        await server.run()
+        await server.run(
+            args.transport,
+            args.host,
+            args.port,
+            keep_alive=args.http_keep_alive,
+            socket_path=socket_path,
+            idle_timeout=args.daemon_idle_timeout,
+        )
     except Exception as e:
         logger.error(f"Server failed to start: {e}")
         raise
 
 
+startup_profile.add("imports", time.perf_counter() - _MODULE_START)
+
+
 def entry_point():
     """Entry point for CLI script"""
+    if sys.argv[1:2] == ["compile"]:
+        compile_command(sys.argv[2:])
+        return
     asyncio.run(main())
 
 
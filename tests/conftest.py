@@ -0,0 +1,21 @@
+import json
+
+import pytest
+
+from main import OpenAPIServer
+
+
+@pytest.fixture
+def make_server(tmp_path):
+    """Build a server over a spec dict, loaded synchronously"""
+
+    def make(spec: dict, **options) -> OpenAPIServer:
+        path = tmp_path / "spec.json"
+        path.write_text(json.dumps(spec))
+        options.setdefault("workers", 0)
+        server = OpenAPIServer(str(path), cache_dir=None, watch=False, **options)
+        for source in server.specs.values():
+            assert source.load_spec()
+        return server
+
+    return make
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from main import ResponseBudget
+
+
+def wide_schema(n: int) -> dict:
+    return {
+        "type": "object",
+        "properties": {
+            f"p{i}": {"type": "string", "description": f"Property number {i}"}
+            for i in range(n)
+        },
+    }
+
+
+def placeholder_bytes(handle: str, size: int) -> int:
+    return len(json.dumps({"$handle": handle, "$bytes": size, "$count": size}))
+
+
+@pytest.mark.parametrize("max_bytes", [200, 1_000, 10_000, 100_000])
+@pytest.mark.parametrize("n", [10, 300, 8_000])
+def test_trimmed_size_within_budget(n, max_bytes):
+    schema = wide_schema(n)
+    budget = ResponseBudget(max_bytes)
+    trimmed = budget.apply(schema, "/schemas/Wide")
+    full = len(json.dumps(schema))
+    size = len(json.dumps(trimmed))
+    assert size <= min(full, max_bytes + placeholder_bytes("/schemas/Wide", full))
+    assert budget.truncated == (full > max_bytes)
+
+
+def test_remaining_entries_collapse_into_one_placeholder():
+    trimmed = ResponseBudget(1_000).apply(wide_schema(8_000), "/schemas/Wide")
+    text = json.dumps(trimmed)
+    assert text.count("$handle") == 1
+    rest = trimmed["properties"]["$rest"]
+    assert rest["$handle"].startswith("/schemas/Wide/properties?from=")
+    assert rest["$count"] + len(trimmed["properties"]) - 1 == 8_000
+
+
+def test_small_values_are_never_replaced():
+    endpoint = {
+        "operationId": "getUser",
+        "summary": "Get a user",
+        "tags": ["Users"],
+        "responses": {"200": {"description": "OK"}},
+    }
+    for max_bytes in (1, 50, 200):
+        trimmed = ResponseBudget(max_bytes).apply(endpoint, "/endpoints/GET/~1users")
+        assert len(json.dumps(trimmed)) <= len(json.dumps(endpoint))
+        assert trimmed == endpoint or "$handle" in trimmed
+
+
+def test_deep_nesting_is_cut_at_max_depth():
+    deep = leaf = {}
+    for _ in range(ResponseBudget.MAX_DEPTH + 10):
+        leaf["next"] = {"value": "x" * 100}
+        leaf = leaf["next"]
+    trimmed = ResponseBudget(10**9).apply(deep, "/schemas/Deep")
+    assert "$handle" in json.dumps(trimmed)
+
+
+def test_rest_handles_expand_to_every_entry(make_server):
+    spec = {
+        "openapi": "3.0.0",
+        "paths": {},
+        "components": {"schemas": {"Wide": wide_schema(500)}},
+    }
+    server = make_server(spec)
+    result = server.get_schema_details("Wide", max_bytes=2_000)
+    assert result["truncated"]
+
+    seen = {}
+    properties = result["schema"]["properties"]
+    while True:
+        rest = properties.pop("$rest", None)
+        seen.update(properties)
+        if rest is None:
+            break
+        expanded = server.expand_handle(rest["$handle"], max_bytes=2_000)
+        assert len(json.dumps(expanded["value"])) <= 2_000
+        properties = expanded["value"]
+    assert seen == wide_schema(500)["properties"]
@@ -0,0 +1,28 @@
+from main import ResponseCache
+
+
+def key(n: int):
+    return ResponseCache.key("get_schema", {"schema_name": f"S{n}"}, (("api", 1),))
+
+
+def test_size_counts_utf8_bytes():
+    cache = ResponseCache(100)
+    cache.put(key(0), "é" * 30)
+    assert cache.stats()["bytes"] == 60
+    cache.put(key(1), "é" * 30)
+    assert cache.get(key(0)) is None
+    assert cache.get(key(1)) == "é" * 30
+    assert cache.stats() == {
+        "entries": 1,
+        "bytes": 60,
+        "max_bytes": 100,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+    }
+
+
+def test_oversized_text_is_not_cached():
+    cache = ResponseCache(100)
+    cache.put(key(0), "é" * 60)
+    assert cache.get(key(0)) is None
@@ -0,0 +1,66 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from main import _open_append, daemon_socket_path
+
+MAIN = Path(__file__).resolve().parent.parent / "main.py"
+
+
+@pytest.fixture
+def tmpdir_fallback(tmp_path, monkeypatch):
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+    return tmp_path / f"openapi-spec-mcp-{os.getuid()}"
+
+
+def test_fallback_directory_is_created_private(tmpdir_fallback):
+    socket_path = daemon_socket_path({"api": "/srv/api.yaml"})
+    assert socket_path.parent == tmpdir_fallback
+    assert tmpdir_fallback.stat().st_mode & 0o777 == 0o700
+
+
+def test_fallback_directory_symlink_is_refused(tmpdir_fallback, tmp_path):
+    target = tmp_path / "elsewhere"
+    target.mkdir(mode=0o700)
+    tmpdir_fallback.symlink_to(target)
+    with pytest.raises(PermissionError):
+        daemon_socket_path({"api": "/srv/api.yaml"})
+
+
+def test_fallback_directory_open_to_others_is_refused(tmpdir_fallback):
+    tmpdir_fallback.mkdir()
+    tmpdir_fallback.chmod(0o777)
+    with pytest.raises(PermissionError):
+        daemon_socket_path({"api": "/srv/api.yaml"})
+
+
+def test_log_and_lock_files_do_not_follow_symlinks(tmp_path):
+    target = tmp_path / "target"
+    link = tmp_path / "spec.log"
+    link.symlink_to(target)
+    with pytest.raises(OSError):
+        _open_append(link, "ab")
+    assert not target.exists()
+
+
+def test_stdio_server_ignores_fallback_directory(tmpdir_fallback, tmp_path):
+    tmpdir_fallback.mkdir()
+    tmpdir_fallback.chmod(0o755)
+    spec = tmp_path / "spec.json"
+    spec.write_text(
+        '{"openapi": "3.0.0", "info": {"title": "t", "version": "1"}, "paths": {}}'
+    )
+    env = {k: v for k, v in os.environ.items() if k != "XDG_RUNTIME_DIR"}
+    env["TMPDIR"] = str(tmp_path)
+    result = subprocess.run(
+        [sys.executable, str(MAIN), str(spec), "--no-watch", "--no-cache"],
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        env=env,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr.decode()
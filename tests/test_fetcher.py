@@ -0,0 +1,136 @@
+import asyncio
+import gzip
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, cast
+
+import pytest
+
+from main import FetchError, RemoteSpecFetcher
+
+BODY = b'{"openapi": "3.0.0", "info": {"title": "t", "version": "1"}, "paths": {}}'
+
+
+class SpecServer(ThreadingHTTPServer):
+    """Records the headers of each request and serves queued failures first"""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), SpecHandler)
+        self.requests: List[Dict[str, str]] = []
+        self.failures: List[int | str] = []
+        self.url = f"http://127.0.0.1:{self.server_address[1]}/openapi.json"
+
+
+class SpecHandler(BaseHTTPRequestHandler):
+    """Serves BODY with an ETag, answering 304 to a matching If-None-Match
+
+    The server's failures list holds statuses (or "close" to drop the
+    connection) to answer with before serving the spec.
+    """
+
+    def do_GET(self):
+        server = cast(SpecServer, self.server)
+        server.requests.append(dict(self.headers))
+        if server.failures:
+            failure = server.failures.pop(0)
+            if failure == "close":
+                self.close_connection = True
+                return
+            assert isinstance(failure, int)
+            self.send_response(failure)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = gzip.compress(BODY)
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def spec_server(monkeypatch):
+    monkeypatch.setattr("main.FETCH_BACKOFF", 0.01)
+    server = SpecServer()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(fetcher: RemoteSpecFetcher):
+    return asyncio.run(fetcher.fetch())
+
+
+def test_fetches_and_revalidates(spec_server, tmp_path):
+    fetcher = RemoteSpecFetcher(spec_server.url, tmp_path, retries=0)
+    assert fetch(fetcher) == BODY
+    assert fetch(fetcher) is None  # 304, already delivered
+    assert spec_server.requests[1]["If-None-Match"] == '"v1"'
+    assert "gzip" in spec_server.requests[0]["Accept-Encoding"]
+
+
+def test_cached_copy_answers_304_on_restart(spec_server, tmp_path):
+    fetch(RemoteSpecFetcher(spec_server.url, tmp_path, retries=0))
+    restarted = RemoteSpecFetcher(spec_server.url, tmp_path, retries=0)
+    assert fetch(restarted) == BODY
+    assert spec_server.requests[-1]["If-None-Match"] == '"v1"'
+
+
+@pytest.mark.parametrize("failures", [[503], [429, 502], ["close", 500]])
+def test_retries_transient_failures(spec_server, tmp_path, failures):
+    spec_server.failures = list(failures)
+    fetcher = RemoteSpecFetcher(spec_server.url, tmp_path, retries=len(failures))
+    assert fetch(fetcher) == BODY
+    assert len(spec_server.requests) == len(failures) + 1
+
+
+def test_gives_up_after_retries(spec_server, tmp_path):
+    spec_server.failures = [503, 503, 503]
+    with pytest.raises(FetchError):
+        fetch(RemoteSpecFetcher(spec_server.url, tmp_path, retries=2))
+    assert len(spec_server.requests) == 3
+
+
+def test_falls_back_to_cached_copy(spec_server, tmp_path):
+    fetch(RemoteSpecFetcher(spec_server.url, tmp_path, retries=0))
+    spec_server.failures = [503, 503]
+    restarted = RemoteSpecFetcher(spec_server.url, tmp_path, retries=1)
+    assert fetch(restarted) == BODY
+    spec_server.failures = [503, 503]
+    with pytest.raises(FetchError):
+        fetch(restarted)  # the cached copy was already delivered
+
+
+def test_client_errors_are_not_retried(spec_server, tmp_path):
+    spec_server.failures = [404]
+    with pytest.raises(FetchError):
+        fetch(RemoteSpecFetcher(spec_server.url, tmp_path, retries=3))
+    assert len(spec_server.requests) == 1
+
+
+def test_refetch_after_release(spec_server, tmp_path):
+    fetcher = RemoteSpecFetcher(spec_server.url, tmp_path, retries=0)
+    assert fetch(fetcher) == BODY
+    fetcher.release()
+    assert fetcher.content is None
+    assert asyncio.run(fetcher.refetch()) == BODY  # from the disk cache
+    assert len(spec_server.requests) == 1
+
+    uncached = RemoteSpecFetcher(spec_server.url, None, retries=0)
+    assert fetch(uncached) == BODY
+    uncached.release()
+    assert asyncio.run(uncached.refetch()) == BODY
+    assert "If-None-Match" not in spec_server.requests[-1]
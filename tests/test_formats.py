@@ -0,0 +1,128 @@
+import asyncio
+import json
+
+import pytest
+import yaml
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "t", "version": "1"},
+    "paths": {
+        "/pets/{id}": {
+            "get": {
+                "summary": "Get a pet – ünïcode",
+                "responses": {
+                    "200": {
+                        "description": "The pet",
+                        "content": {
+                            "application/json": {
+                                "schema": {"$ref": "#/components/schemas/Pet"}
+                            }
+                        },
+                    }
+                },
+            }
+        }
+    },
+    "components": {
+        "schemas": {
+            "Pet": {
+                "description": "A pet\n  in the store",
+                "type": "object",
+                "required": ["id", "kind"],
+                "properties": {
+                    "id": {"type": "integer", "format": "int64"},
+                    "kind": {"type": "string", "enum": ["cat", "dog"]},
+                    "tags": {
+                        "type": "array",
+                        "items": {"$ref": "#/components/schemas/Tag"},
+                    },
+                    "owner": {
+                        "type": "object",
+                        "description": "Who owns it",
+                        "properties": {
+                            "name": {"type": "string", "nullable": True},
+                            "phones": {"type": "array", "items": {"type": "string"}},
+                        },
+                    },
+                    "scores": {
+                        "type": "array",
+                        "items": {"oneOf": [{"type": "integer"}, {"type": "string"}]},
+                    },
+                    "extra-data": {
+                        "type": "object",
+                        "additionalProperties": {"type": "number"},
+                    },
+                    "best_friend_tag": {"$ref": "#/components/schemas/Tag"},
+                },
+            },
+            "Tag": {"type": "object", "properties": {"label": {"type": "string"}}},
+        }
+    },
+}
+
+PET_TYPESCRIPT = """\
+// #/components/schemas/Pet
+/** A pet in the store */
+type Pet = {
+  id: number /* int64 */;
+  kind: "cat" | "dog";
+  tags?: ({
+    label?: string;
+  })[];
+  /** Who owns it */
+  owner?: {
+    name?: string | null;
+    phones?: string[];
+  };
+  scores?: (number | string)[];
+  "extra-data"?: {
+    [key: string]: number;
+  };
+  best_friend_tag?: {
+    label?: string;
+  };
+};"""
+
+
+@pytest.fixture
+def server(make_server):
+    server = make_server(SPEC)
+    for source in server.specs.values():
+        source.ready.set()
+    return server
+
+
+def run(server, name: str, arguments: dict) -> str:
+    return asyncio.run(server._run_tool(name, arguments))
+
+
+@pytest.mark.parametrize(
+    ("name", "arguments"),
+    [
+        ("get_schema", {"schema_name": "Pet"}),
+        ("get_endpoint", {"path": "/pets/{id}", "method": "GET"}),
+        ("search_endpoints", {"query": "pet"}),
+        ("list_all_endpoints", {}),
+    ],
+)
+def test_yaml_and_compact_json_round_trip(server, name, arguments):
+    expected = json.loads(run(server, name, arguments))
+    compact = run(server, name, {**arguments, "format": "json-compact"})
+    assert "\n" not in compact
+    assert json.loads(compact) == expected
+    text = run(server, name, {**arguments, "format": "yaml"})
+    assert "&id" not in text and "*id" not in text  # shared subtrees repeated
+    assert yaml.safe_load(text) == expected
+
+
+def test_typescript_schema(server):
+    arguments = {"schema_name": "Pet", "format": "typescript"}
+    assert run(server, "get_schema", arguments) == PET_TYPESCRIPT
+
+
+def test_typescript_falls_back_to_compact_json(server):
+    expected = json.loads(run(server, "search_endpoints", {"query": "pet"}))
+    text = run(server, "search_endpoints", {"query": "pet", "format": "typescript"})
+    assert "\n" not in text
+    assert json.loads(text) == expected
@@ -0,0 +1,98 @@
+import asyncio
+import gc
+import json
+import logging
+
+import pytest
+
+from main import OpenAPIServer
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "t", "version": "1"},
+    "paths": {"/items": {"get": {"summary": "List items", "responses": {}}}},
+}
+
+
+def test_wait_times_out_without_leaking_futures(make_server, caplog):
+    server = make_server(SPEC, ready_timeout=0.2)
+    source = next(iter(server.specs.values()))
+    source.ready.clear()
+    source.load_phase = "parsing"
+
+    async def call():
+        with pytest.raises(TimeoutError, match="still loading"):
+            await server._run_tool("search_endpoints", {"query": "items"})
+        await asyncio.sleep(0)
+
+    with caplog.at_level(logging.ERROR, logger="asyncio"):
+        asyncio.run(call())
+        gc.collect()
+    assert "never retrieved" not in caplog.text
+
+
+def test_wait_returns_once_loaded(make_server):
+    server = make_server(SPEC, ready_timeout=5)
+    source = next(iter(server.specs.values()))
+    source.ready.clear()
+
+    async def call():
+        asyncio.get_running_loop().call_later(0.1, source.ready.set)
+        return json.loads(
+            await server._run_tool("search_endpoints", {"query": "items"})
+        )
+
+    assert asyncio.run(call())[0]["path"] == "/items"
+
+
+def test_reload_resets_load_phase(make_server):
+    server = make_server(SPEC)
+    source = next(iter(server.specs.values()))
+    generation = source.snapshot[1]
+    assert source.load_spec()
+    assert (source.load_phase, source.snapshot[1]) == ("loaded", generation + 1)
+
+    source.docs_path.write_text("{not json")
+    assert not source.load_spec()
+    assert (source.load_phase, source.snapshot[1]) == ("loaded", generation + 1)
+
+
+def test_unknown_spec_fails_without_waiting(make_server):
+    server = make_server(SPEC, ready_timeout=30)
+    next(iter(server.specs.values())).ready.clear()
+
+    async def call():
+        with pytest.raises(ValueError, match="Unknown spec: nope"):
+            await asyncio.wait_for(
+                server._run_tool("search_endpoints", {"query": "x", "spec": "nope"}), 1
+            )
+
+    asyncio.run(call())
+
+
+def test_cross_spec_calls_answer_from_loaded_specs(tmp_path):
+    locations = {}
+    for name in ("ready", "slow"):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(SPEC))
+        locations[name] = str(path)
+    server = OpenAPIServer(
+        locations, cache_dir=None, watch=False, workers=0, ready_timeout=30
+    )
+    for source in server.specs.values():
+        assert source.load_spec()
+    server.specs["ready"].ready.set()
+
+    async def call(name, arguments):
+        text = await asyncio.wait_for(server._run_tool(name, arguments), 1)
+        return json.loads(text)
+
+    search = asyncio.run(call("search_endpoints", {"query": "items"}))
+    assert search["loading"] == ["slow"]
+    assert [r["spec"] for r in search["results"]] == ["ready"]
+    match = asyncio.run(call("match_endpoint", {"url": "/items", "method": "GET"}))
+    assert (match["spec"], match["loading"]) == ("ready", ["slow"])
+
+    server.specs["slow"].ready.set()
+    search = asyncio.run(call("search_endpoints", {"query": "items"}))
+    assert sorted(r["spec"] for r in search) == ["ready", "slow"]
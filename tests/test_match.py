@@ -0,0 +1,78 @@
+import pytest
+
+
+def operation(summary: str) -> dict:
+    return {"get": {"summary": summary, "responses": {}}}
+
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "t", "version": "1"},
+    "servers": [{"url": "https://api.example.com/v2"}],
+    "paths": {
+        "/users/{id}": operation("Get user"),
+        "/users/me": operation("Get current user"),
+        "/users/{id}/avatar": operation("Get avatar"),
+        "/reports/{name}.json": operation("Get JSON report"),
+        "/reports/{name}": operation("Get report"),
+        "/files/{path}": operation("Get file"),
+    },
+}
+
+
+@pytest.fixture
+def server(make_server):
+    return make_server(SPEC)
+
+
+@pytest.mark.parametrize(
+    ("url", "summary", "params"),
+    [
+        ("/users/me", "Get current user", {}),
+        ("/users/42", "Get user", {"id": "42"}),
+        ("/users/42/avatar", "Get avatar", {"id": "42"}),
+        ("/reports/q3.json", "Get JSON report", {"name": "q3"}),
+        ("/reports/q3.csv", "Get report", {"name": "q3.csv"}),
+    ],
+)
+def test_literal_beats_pattern_beats_param(server, url, summary, params):
+    result = server.match_endpoint(url, "GET")
+    assert result["details"]["summary"] == summary
+    assert result["path_params"] == params
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/v2/users/42?expand=avatar",
+        "https://api.example.com/v2/users/42",
+        "https://other.example.com/v2/users/42#top",
+    ],
+)
+def test_server_base_path_is_stripped(server, url):
+    result = server.match_endpoint(url, "GET")
+    assert result["path"] == "/users/{id}"
+    assert result["path_params"] == {"id": "42"}
+
+
+def test_params_are_percent_decoded(server):
+    result = server.match_endpoint("/files/docs%2Fa%20b.txt", "GET")
+    assert result["path"] == "/files/{path}"
+    assert result["path_params"] == {"path": "docs/a b.txt"}
+
+
+def test_no_match(server):
+    assert server.match_endpoint("/orders/1", "GET") == {
+        "error": "No endpoint matches /orders/1"
+    }
+    assert server.match_endpoint("/v3/users/1/avatar/big", "GET") == {
+        "error": "No endpoint matches /v3/users/1/avatar/big"
+    }
+
+
+def test_other_method_lists_allowed_methods(server):
+    result = server.match_endpoint("/users/42", "DELETE")
+    assert result == {
+        "error": "Method DELETE not allowed for /users/42",
+        "allowed_methods": ["GET"],
+    }
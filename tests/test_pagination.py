@@ -0,0 +1,74 @@
+import base64
+
+import pytest
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "t", "version": "1"},
+    "paths": {
+        f"/items{i:02d}": {
+            "get": {"summary": f"Get {i}", "tags": ["Odd" if i % 2 else "Even"]},
+            "delete": {"summary": f"Delete {i}", "tags": ["Admin"]},
+        }
+        for i in range(25)
+    },
+}
+
+
+@pytest.fixture
+def server(make_server):
+    return make_server(SPEC)
+
+
+def pages(server, limit, **filters):
+    """Every endpoint listed by following next_cursor"""
+    listed, cursor = [], None
+    while True:
+        page = server.list_endpoints(limit, cursor, **filters)
+        listed += [(e["method"], e["path"]) for e in page["endpoints"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return listed, page
+
+
+@pytest.mark.parametrize("limit", [1, 7, 50, 100])
+def test_cursor_walks_every_endpoint_once(server, limit):
+    listed, last = pages(server, limit)
+    assert len(listed) == len(set(listed)) == last["total"] == 50
+    assert listed == sorted(listed, key=lambda e: (e[1], e[0]))
+    assert last["next_cursor"] is None
+
+
+def test_filters_combine_with_cursor(server):
+    listed, last = pages(server, 4, tag="even", method="get")
+    assert listed == [("GET", f"/items{i:02d}") for i in range(0, 25, 2)]
+    assert last["total"] == 13
+    assert pages(server, 4, tag="admin", method="GET")[0] == []
+
+
+def test_cursor_is_bound_to_its_filters(server):
+    cursor = server.list_endpoints(5, tag="Admin")["next_cursor"]
+    assert server.list_endpoints(5, cursor, tag="admin")["endpoints"]
+    for filters in ({}, {"tag": "Even"}, {"tag": "Admin", "method": "DELETE"}):
+        result = server.list_endpoints(5, cursor, **filters)
+        assert "other tag or method filters" in result["error"]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not base64!",
+        base64.urlsafe_b64encode(b"10").decode(),
+        base64.urlsafe_b64encode(b"[0, [null, null], -1]").decode(),
+        base64.urlsafe_b64encode(b'[0, [null, null], "5"]').decode(),
+    ],
+)
+def test_invalid_cursor_is_rejected(server, cursor):
+    assert server.list_endpoints(5, cursor) == {"error": f"Invalid cursor: {cursor}"}
+
+
+def test_cursor_is_rejected_after_reload(server):
+    cursor = server.list_endpoints(5)["next_cursor"]
+    source = next(iter(server.specs.values()))
+    assert source.load_spec()
+    assert "Stale cursor" in server.list_endpoints(5, cursor)["error"]
@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+
+from main import OpenAPIServer
+
+
+def small_spec(name: str, n: int = 50) -> dict:
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": name, "version": "1"},
+        "paths": {
+            f"/{name}/items{i}/{{id}}": {
+                "get": {
+                    "summary": f"Get {name} item {i}",
+                    "responses": {"200": {"description": "x" * 200}},
+                }
+            }
+            for i in range(n)
+        },
+        "components": {"schemas": {f"{name.title()}Item": {"type": "object"}}},
+    }
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Three specs under a budget that keeps one spec body resident"""
+    locations = {}
+    for name in ("alpha", "beta", "gamma"):
+        path = tmp_path / f"{name}.json"
+        path.write_text(json.dumps(small_spec(name)))
+        locations[name] = str(path)
+    server = OpenAPIServer(
+        locations,
+        cache_dir=tmp_path / "cache",
+        watch=False,
+        workers=0,
+        spec_memory_bytes=1,
+    )
+    for source in server.specs.values():
+        assert source.load_spec()
+        source.ready.set()
+        source.load_phase = "loaded"
+    return server
+
+
+def call(server: OpenAPIServer, name: str, arguments: dict) -> object:
+    return json.loads(asyncio.run(server._run_tool(name, arguments)))
+
+
+def test_cross_spec_search_does_not_restore(server):
+    assert [s.evicted for s in server.specs.values()] == [True, True, False]
+    results = call(server, "search_endpoints", {"query": "item", "limit": 500})
+    assert isinstance(results, list)
+    assert {r["spec"] for r in results} == {"alpha", "beta", "gamma"}
+    assert call(server, "search_schemas", {"query": "item"})
+    assert all(source.restores == 0 for source in server.specs.values())
+    assert [s.evicted for s in server.specs.values()] == [True, True, False]
+
+
+def test_match_restores_only_the_matching_spec(server):
+    result = call(server, "match_endpoint", {"url": "/alpha/items3/7", "method": "GET"})
+    assert isinstance(result, dict)
+    assert result["spec"] == "alpha"
+    assert result["path_params"] == {"id": "7"}
+    assert [s.restores for s in server.specs.values()] == [1, 0, 0]
+
+
+def test_restore_keeps_generation_and_resets_phase(server):
+    alpha = server.specs["alpha"]
+    generation = alpha.snapshot[1]
+    result = call(
+        server,
+        "get_endpoint",
+        {"spec": "alpha", "path": "/alpha/items1/{id}", "method": "GET"},
+    )
+    assert isinstance(result, dict)
+    assert result["details"]["summary"] == "Get alpha item 1"
+    assert not alpha.evicted
+    assert alpha.snapshot[1] == generation
+    assert alpha.load_phase == "loaded"
+
+
+def test_restore_of_changed_spec_bumps_generation(server, tmp_path):
+    alpha = server.specs["alpha"]
+    arguments = {"spec": "alpha", "path": "/alpha/items1/{id}", "method": "GET"}
+    call(server, "get_endpoint", arguments)
+    generation = alpha.snapshot[1]
+    alpha.evict()
+    spec = small_spec("alpha")
+    spec["paths"]["/alpha/items1/{id}"]["get"]["summary"] = "Renamed"
+    (tmp_path / "alpha.json").write_text(json.dumps(spec))
+    call(server, "get_endpoint", {**arguments, "path": "/alpha/items2/{id}"})
+    assert alpha.restores == 2
+    assert alpha.snapshot[1] == generation + 1
+    result = call(server, "get_endpoint", arguments)
+    assert isinstance(result, dict)
+    assert result["details"]["summary"] == "Renamed"
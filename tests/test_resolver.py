@@ -0,0 +1,82 @@
+def spec_with(schemas: dict) -> dict:
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": "t", "version": "1"},
+        "paths": {},
+        "components": {"schemas": schemas},
+    }
+
+
+def ref(name: str) -> dict:
+    return {"$ref": f"#/components/schemas/{name}"}
+
+
+def circular(name: str) -> dict:
+    return {"error": f"Circular reference detected: #/components/schemas/{name}"}
+
+
+def test_self_cycle_is_marked_like_before(make_server):
+    server = make_server(
+        spec_with(
+            {"Node": {"type": "object", "properties": {"next": ref("Node")}}},
+        )
+    )
+    assert server.resolve_schema_ref("#/components/schemas/Node") == {
+        "type": "object",
+        "properties": {"next": circular("Node")},
+    }
+
+
+def test_mutual_cycle_marks_the_reference_closing_it(make_server):
+    server = make_server(
+        spec_with(
+            {
+                "A": {"properties": {"b": ref("B")}},
+                "B": {"properties": {"a": ref("A"), "leaf": ref("Leaf")}},
+                "Leaf": {"type": "string"},
+                "Root": {"properties": {"a": ref("A")}},
+            }
+        )
+    )
+    a = server.resolve_schema_ref("#/components/schemas/A")
+    assert a == {"properties": {"b": circular("B")}}
+    assert server.resolve_schema_ref("#/components/schemas/B") == {
+        "properties": {"a": circular("A"), "leaf": {"type": "string"}}
+    }
+    root = server.resolve_schema_ref("#/components/schemas/Root")
+    assert root == {"properties": {"a": a}}
+
+
+def test_diamond_expands_every_path(make_server):
+    server = make_server(
+        spec_with(
+            {
+                "Top": {"properties": {"left": ref("Left"), "right": ref("Right")}},
+                "Left": {"properties": {"base": ref("Base")}},
+                "Right": {"items": [ref("Base")], "description": "right"},
+                "Base": {"type": "integer"},
+            }
+        )
+    )
+    top = server.resolve_schema_ref("#/components/schemas/Top")
+    assert top == {
+        "properties": {
+            "left": {"properties": {"base": {"type": "integer"}}},
+            "right": {"items": [{"type": "integer"}], "description": "right"},
+        }
+    }
+    left, right = top["properties"]["left"], top["properties"]["right"]
+    assert left["properties"]["base"] is right["items"][0]  # expanded once
+
+
+def test_deep_chain_does_not_recurse_per_reference(make_server):
+    depth = 5_000
+    schemas: dict = {
+        f"S{i}": {"properties": {"next": ref(f"S{i + 1}")}} for i in range(depth)
+    }
+    schemas[f"S{depth}"] = {"type": "null"}
+    server = make_server(spec_with(schemas))
+    node = server.resolve_schema_ref("#/components/schemas/S0")
+    for _ in range(depth):
+        node = node["properties"]["next"]
+    assert node == {"type": "null"}
@@ -0,0 +1,125 @@
+import pytest
+
+from main import InvertedIndex
+
+SPEC = {
+    "openapi": "3.0.0",
+    "info": {"title": "t", "version": "1"},
+    "paths": {
+        "/users/{userId}": {
+            "get": {"summary": "Fetch one account", "operationId": "getUser"},
+        },
+        "/orders": {
+            "post": {
+                "summary": "Place an order",
+                "description": "Charges the stored payment method",
+                "tags": ["Billing"],
+            },
+        },
+        "/session": {"delete": {"summary": "Log out"}},
+    },
+    "components": {
+        "schemas": {"UserProfile": {"type": "object"}, "Order": {"type": "object"}}
+    },
+}
+
+
+@pytest.fixture
+def server(make_server):
+    return make_server(SPEC)
+
+
+def found(results) -> list:
+    return [(r["method"], r["path"]) for r in results]
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("users", ("GET", "/users/{userId}")),  # path segment
+        ("userid", ("GET", "/users/{userId}")),  # compound param name
+        ("account", ("GET", "/users/{userId}")),  # summary
+        ("payment", ("POST", "/orders")),  # description
+        ("billing", ("POST", "/orders")),  # tag
+        ("getUser", ("GET", "/users/{userId}")),  # operationId
+        ("LOG OUT", ("DELETE", "/session")),
+    ],
+)
+def test_indexes_every_field(server, query, expected):
+    assert found(server.search_endpoints(query)) == [expected]
+
+
+def test_every_query_token_must_match(server):
+    assert found(server.search_endpoints("order payment")) == [("POST", "/orders")]
+    assert server.search_endpoints("order account") == []
+
+
+def test_tokens_match_as_prefixes_not_substrings(server):
+    assert found(server.search_endpoints("use")) == [("GET", "/users/{userId}")]
+    assert server.search_endpoints("ser") == []
+    assert server.search_endpoints("sers") == []
+    assert [s["name"] for s in server.search_schemas("prof")] == ["UserProfile"]
+    assert server.search_schemas("rofile") == []
+
+
+def ranked(*documents: str) -> InvertedIndex:
+    index = InvertedIndex()
+    for document in documents:
+        index.add(document)
+    index.finalize()
+    return index
+
+
+def ids(results) -> list:
+    return [doc_id for doc_id, _ in results]
+
+
+def test_bm25_ordering():
+    index = ranked(
+        "user",
+        "user settings and preferences for the account page",
+        "user user",
+        "orders",
+    )
+    # Repeated terms beat single ones, and shorter documents longer ones
+    assert ids(index.search("user", 10)) == [2, 0, 1]
+    scores = [score for _, score in index.search("user", 10)]
+    assert scores == sorted(scores, reverse=True)
+    assert index.search("nothing", 10) == []
+
+
+def test_exact_matches_beat_prefix_matches():
+    assert ids(ranked("users", "user").search("user", 10)) == [1, 0]
+
+
+def test_rare_terms_weigh_more():
+    index = ranked("user order", "user order", "user", "user", "order invoice")
+    assert ids(index.search("order user", 10)) == [0, 1]
+    assert index.search("invoice", 1)[0][1] > index.search("user", 1)[0][1]
+
+
+def test_limit_and_offset_page_through_the_ranking():
+    index = ranked(*(f"item {'item ' * (i % 4)}{i}" for i in range(20)))
+    everything = index.search("item", 20)
+    assert len(everything) == 20
+    pages = [index.search("item", 6, offset) for offset in range(0, 20, 6)]
+    assert [entry for page in pages for entry in page] == everything
+    assert index.search("item", 5, 18) == everything[18:]
+    assert index.search("item", 0) == []
+    assert index.search("item", 5, 25) == []
+
+
+def test_ties_keep_document_order():
+    index = ranked(*["same words"] * 5)
+    assert ids(index.search("same", 3, 1)) == [1, 2, 3]
+    assert ids(index.search("", 3, 1)) == [1, 2, 3]  # empty query lists in order
+
+
+def test_tools_rank_and_page(server):
+    all_results = found(server.search_endpoints("order", limit=10))
+    assert all_results[0] == ("POST", "/orders")
+    assert found(server.search_endpoints("", limit=2, offset=1)) == [
+        ("POST", "/orders"),
+        ("DELETE", "/session"),
+    ]
+    assert [s["name"] for s in server.search_schemas("order", limit=1)] == ["Order"]
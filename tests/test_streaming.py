@@ -0,0 +1,78 @@
+import io
+import json
+from collections.abc import Mapping
+
+import pytest
+
+from main import UnstreamableSpec, parse_document, stream_spec
+
+SPEC_YAML = b"""\
+openapi: 3.0.0
+info: {title: t, version: '1'}
+x-shared: &shared
+  description: shared
+paths:
+  /a:
+    get:
+      responses:
+        '200': *shared
+    put:
+      <<: *shared
+      summary: merged
+components:
+  schemas:
+    Big: {type: integer, maximum: 123456789012345678901234567890}
+"""
+
+
+def plain(value):
+    if isinstance(value, Mapping):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [plain(item) for item in value]
+    return value
+
+
+def streamed(content: bytes, fmt: str) -> dict:
+    spec = plain(stream_spec(io.BytesIO(content), fmt))
+    assert isinstance(spec, dict)
+    return spec
+
+
+def test_yaml_matches_whole_document_parse():
+    assert streamed(SPEC_YAML, "yaml") == parse_document(SPEC_YAML, "yaml")
+
+
+def test_json_matches_whole_document_parse():
+    content = (
+        json.dumps(parse_document(SPEC_YAML, "yaml"))
+        .replace("123456789012345678901234567890", "12345")
+        .encode()
+    )
+    assert streamed(content + b"\n  \n", "json") == json.loads(content)
+
+
+@pytest.mark.parametrize(
+    "content, fmt",
+    [
+        (b"openapi: 3.0.0\n---\npaths: {}\n", "yaml"),
+        (b"openapi: 3.0.0\n...\n---\npaths: {}\n", "yaml"),
+        (b"openapi: 3.0.0\npaths: {\n", "yaml"),
+        (b"", "yaml"),
+        (b"- not a mapping\n", "yaml"),
+        (b'{"openapi": "3.0.0"} trailing', "json"),
+        (b'{"openapi": "3.0.0"} {"paths": {}}', "json"),
+        (b'{"openapi": "3.0.0", "paths": {', "json"),
+        (b'{"x": 123456789012345678901234567890}', "json"),
+        (b"[1, 2]", "json"),
+    ],
+)
+def test_falls_back_to_whole_document_parse(content, fmt):
+    with pytest.raises(UnstreamableSpec):
+        stream_spec(io.BytesIO(content), fmt)
+
+
+def test_merge_key_between_path_items_is_unstreamable():
+    content = b"paths:\n  /a: &a {get: {}}\n  <<: {/b: {get: {}}}\n"
+    with pytest.raises(UnstreamableSpec):
+        stream_spec(io.BytesIO(content), "yaml")